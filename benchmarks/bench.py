@@ -0,0 +1,222 @@
+"""Offline benchmarks of the parsing and rendering hot paths.
+
+Runs against the fixtures in benchmarks/fixtures (both feed formats,
+devotional pages with an <audio> tag, a playlist.json player or only a bare
+MP3 link, and a hero JPEG), so results do not depend on the network.
+
+    python3 benchmarks/bench.py                  # run everything, compare with the baseline
+    python3 benchmarks/bench.py extract -r 15    # cases whose name contains "extract"
+    python3 benchmarks/bench.py --json out.json  # also write the results as JSON
+    python3 benchmarks/bench.py --save-baseline  # keep this run as the baseline
+
+Each case is calibrated to run for at least ``--min-time`` per round; the
+median, IQR and minimum of the per-call time over the rounds are reported.
+A case regresses when both its median and its fastest round are more than
+``--tolerance`` slower than the baseline's, which keeps a noisy neighbour
+from failing the run.  As with timeit, the garbage collector is paused
+while a round runs.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+sys.path.insert(0, ROOT)
+
+PAGES = ("audio", "playlist", "plain")
+
+
+def fixture(name, mode="r"):
+    with open(os.path.join(FIXTURES, name), mode) as f:
+        return f.read()
+
+# ----------------------------
+# Cases
+# ----------------------------
+def cases():
+    """(name, setup) pairs; ``setup()`` returns the function to time"""
+    def wordpress_feed(count):
+        def setup():
+            from odb.feed import parse_feed
+            text = fixture("wordpress_feed.xml")
+            return lambda: parse_feed(text, count)
+        return setup
+
+    def api_feed(count):
+        def setup():
+            from odb.feed import parse_api_feed
+            content = fixture("api_feed.xml", "rb")
+            return lambda: parse_api_feed(content, count)
+        return setup
+
+    def extractor(fn_name, page):
+        def setup():
+            from odb import extract
+            html = fixture(f"page_{page}.html")
+            fn = getattr(extract, fn_name)
+            return lambda: fn(html)
+        return setup
+
+    def soup_extractor(fn_name, page):
+        def setup():
+            from bs4 import BeautifulSoup
+            from odb import extract
+            soup = BeautifulSoup(fixture(f"page_{page}.html"), "html.parser")
+            fn = getattr(extract, fn_name)
+            return lambda: fn(soup)
+        return setup
+
+    def page_parse(page):
+        def setup():
+            from bs4 import BeautifulSoup
+            html = fixture(f"page_{page}.html")
+            return lambda: BeautifulSoup(html, "html.parser")
+        return setup
+
+    def image_scale():
+        from odb.display import scale_image
+        img_data = fixture("hero.jpg", "rb")
+        return lambda: scale_image(img_data)
+
+    def format_times():
+        from odb.display import format_time
+        # Every value a slider shows over a 70 minute recording, in 4 s steps
+        values = range(0, 70 * 60 * 1000, 4000)
+        return lambda: [format_time(ms) for ms in values]
+
+    yield "feed.wordpress.first", wordpress_feed(1)
+    yield "feed.wordpress.week", wordpress_feed(7)
+    yield "feed.api.first", api_feed(1)
+    yield "feed.api.week", api_feed(7)
+    for page in PAGES:
+        yield f"page.parse.{page}", page_parse(page)
+        yield f"extract.mp3.{page}", extractor("extract_mp3", page)
+        yield f"extract.page.{page}", extractor("extract_page", page)
+    yield "extract.bible_link", soup_extractor("extract_bible_link", "audio")
+    yield "extract.bible_in_one_year", soup_extractor("extract_bible_in_one_year", "audio")
+    yield "image.scale", image_scale
+    yield "format_time.x1050", format_times
+
+# ----------------------------
+# Measurement
+# ----------------------------
+def _round(fn, loops):
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return (time.perf_counter() - start) / loops
+    finally:
+        gc.enable()
+
+
+def measure(fn, rounds, min_time):
+    """Per-call seconds for each of ``rounds`` calibrated rounds"""
+    loops = 1
+    while True:
+        elapsed = _round(fn, loops) * loops
+        if elapsed >= min_time:
+            break
+        loops *= max(2, min(10, int(min_time / max(elapsed, 1e-9))))
+    _round(fn, loops)  # warm-up at the final loop count
+    return [_round(fn, loops) for _ in range(rounds)], loops
+
+
+def summarize(times, loops):
+    quartiles = statistics.quantiles(times, n=4) if len(times) > 1 else [times[0]] * 3
+    return {
+        "median_us": statistics.median(times) * 1e6,
+        "min_us": min(times) * 1e6,
+        "iqr_us": (quartiles[2] - quartiles[0]) * 1e6,
+        "stdev_us": statistics.stdev(times) * 1e6 if len(times) > 1 else 0.0,
+        "rounds": len(times),
+        "loops": loops,
+    }
+
+
+def compare(result, base, tolerance):
+    if base is None or "median_us" not in base or "median_us" not in result:
+        return ""
+    ratio = result["median_us"] / base["median_us"]
+    if ratio > 1 + tolerance and result["min_us"] > base["min_us"] * (1 + tolerance):
+        result["regression"] = True
+        return f"{ratio:5.2f}x  REGRESSION"
+    if ratio < 1 - tolerance:
+        return f"{ratio:5.2f}x  faster"
+    return f"{ratio:5.2f}x"
+
+
+def _fmt(us):
+    if us >= 1000:
+        return f"{us / 1000:9.2f} ms"
+    return f"{us:9.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks over recorded fixtures")
+    parser.add_argument("filter", nargs="*", help="only run cases whose name contains one of these")
+    parser.add_argument("-r", "--rounds", type=int, default=9)
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per round (default 0.05)")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown against the baseline (default 0.15)")
+    parser.add_argument("--json", metavar="FILE", help="write results to FILE")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline file to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    for name, setup in cases():
+        if args.filter and not any(word in name for word in args.filter):
+            continue
+        try:
+            fn = setup()
+            fn()
+        except Exception as e:
+            # e.g. the lxml "xml" parser missing for the WordPress feed
+            results[name] = {"skipped": f"{type(e).__name__}: {e}"}
+            print(f"{name:<28} skipped ({type(e).__name__}: {e})")
+            continue
+        times, loops = measure(fn, args.rounds, args.min_time)
+        result = results[name] = summarize(times, loops)
+        verdict = compare(result, baseline.get(name), args.tolerance)
+        print(f"{name:<28} {_fmt(result['median_us'])} +- {_fmt(result['iqr_us'] / 2).strip():>10}"
+              f"  min {_fmt(result['min_us'])}  {verdict}")
+
+    report = {
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"[INFO] Baseline written to {args.baseline}")
+
+    regressions = [name for name, result in results.items() if result.get("regression")]
+    if regressions:
+        print(f"[ERROR] Slower than the baseline: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
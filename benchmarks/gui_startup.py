@@ -0,0 +1,223 @@
+"""End-to-end GUI startup benchmark, headless and offline.
+
+Launches each viewer in a fresh interpreter under ``QT_QPA_PLATFORM=offscreen``
+with ``ODB_REPLAY`` pointed at a replay server over benchmarks/fixtures, and
+records for every launch (milliseconds since the process was spawned):
+
+    import       the script's module imported
+    construct    ODBViewer built (feed, page and audio setup; the image loads in the background)
+    first_paint  the window's first paint event
+    ready        the player has the audio loaded (or there is no audio)
+
+plus the peak RSS.  Medians over the iterations are compared with
+gui_budget.json and the run exits 1 when any budget is exceeded.
+
+    python3 benchmarks/gui_startup.py                   # six, one and three, 5 launches each
+    python3 benchmarks/gui_startup.py six -n 20 --latency 100
+    python3 benchmarks/gui_startup.py --warm            # keep the cache between launches
+    python3 benchmarks/gui_startup.py --update          # reset budgets to 1.5x now
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import importlib
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+BUDGET_FILE = os.path.join(HERE, "gui_budget.json")
+MARKER = "ODB-GUI-STARTUP "
+METRICS = ("import", "construct", "first_paint", "ready")
+
+
+def _launch_six(module):
+    return module.ODBViewer(module.fetch_items(1)[0])
+
+def _launch_first_item(module):
+    return module.ODBViewer(module.fetch_first_item())
+
+# How each script's __main__ block builds its window
+TARGETS = {
+    "six": _launch_six,
+    "one": _launch_first_item,
+    "three": _launch_first_item,
+}
+
+# ----------------------------
+# Child: one launch
+# ----------------------------
+def child(name, timeout):
+    t0 = float(os.environ["ODB_BENCH_T0"])
+    marks = {}
+
+    def mark(key):
+        marks.setdefault(key, round((time.time() - t0) * 1000, 1))
+
+    sys.path.insert(0, ROOT)
+    module = importlib.import_module(name)
+    mark("import")
+
+    import resource
+    from PyQt5.QtCore import QEvent, QObject, QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication([name])
+    viewer = TARGETS[name](module)
+    mark("construct")
+
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint:
+                mark("first_paint")
+            return False
+
+    painted = FirstPaint()
+    viewer.installEventFilter(painted)
+
+    def audio_ready():
+        if getattr(viewer, "pending_details", None) is not None:
+            return False  # six.py: the page (and so the MP3 URL) is still loading
+        player = getattr(viewer, "player", None)
+        if player is None:
+            return True
+        from PyQt5.QtMultimedia import QMediaPlayer
+        return (player.duration() > 0 or player.error() != QMediaPlayer.NoError
+                or player.mediaStatus() in (QMediaPlayer.LoadedMedia, QMediaPlayer.BufferedMedia,
+                                            QMediaPlayer.InvalidMedia))
+
+    def poll():
+        if "first_paint" in marks and audio_ready():
+            mark("ready")
+            app.quit()
+
+    timer = QTimer()
+    timer.timeout.connect(poll)
+    timer.start(5)
+    QTimer.singleShot(int(timeout * 1000), app.quit)
+    viewer.show()
+    app.exec_()
+
+    marks["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(MARKER + json.dumps(marks), flush=True)
+    os._exit(0)  # skip Qt teardown; it is not part of startup
+
+# ----------------------------
+# Parent: many launches
+# ----------------------------
+def launch(name, env, timeout):
+    env = dict(env, ODB_BENCH_T0=repr(time.time()))
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name, "--timeout", str(timeout)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout + 60,
+    )
+    for line in result.stdout.splitlines():
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER):])
+    raise RuntimeError(f"{name} failed:\n{(result.stderr or result.stdout).strip()[-2000:]}")
+
+
+def run(name, iterations, replay_url, warm, timeout):
+    cache = tempfile.mkdtemp(prefix="odb-gui-bench-")
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen", ODB_REPLAY=replay_url, ODB_CACHE_DIR=cache)
+    env.pop("ODB_TRACE", None)
+    runs = []
+    try:
+        for _ in range(iterations):
+            if not warm:
+                shutil.rmtree(cache, ignore_errors=True)
+                os.makedirs(cache)
+            runs.append(launch(name, env, timeout))
+    finally:
+        shutil.rmtree(cache, ignore_errors=True)
+
+    summary = {"launches": len(runs)}
+    for metric in METRICS:
+        values = [r[metric] for r in runs if metric in r]
+        if len(values) < len(runs):
+            summary[f"{metric}_timeouts"] = len(runs) - len(values)
+        if values:
+            summary[metric] = statistics.median(values)
+            summary[f"{metric}_p90"] = sorted(values)[int(0.9 * (len(values) - 1))]
+    summary["peak_rss_mb"] = round(max(r["peak_rss_kb"] for r in runs) / 1024, 1)
+    return summary
+
+
+def check(summary, budget):
+    problems = []
+    for key, limit in budget.items():
+        if key.endswith("_timeouts"):
+            continue
+        value = summary.get(key)
+        if value is None:
+            problems.append(f"{key} never reached")
+        elif value > limit:
+            problems.append(f"{key} {value} > budget {limit}")
+    for metric in METRICS:
+        if summary.get(f"{metric}_timeouts"):
+            problems.append(f"{metric} timed out in {summary[f'{metric}_timeouts']} launch(es)")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless GUI startup benchmark")
+    parser.add_argument("targets", nargs="*", help=f"scripts to launch (default: {' '.join(TARGETS)})")
+    parser.add_argument("-n", "--iterations", type=int, default=5)
+    parser.add_argument("--latency", type=int, default=0, metavar="MS", help="replay latency per response")
+    parser.add_argument("--bandwidth", type=int, default=0, metavar="KBPS", help="replay bandwidth cap")
+    parser.add_argument("--warm", action="store_true", help="keep the cache between launches")
+    parser.add_argument("--timeout", type=float, default=20, help="seconds before a launch gives up")
+    parser.add_argument("--json", metavar="FILE", help="write the summaries to FILE")
+    parser.add_argument("--update", action="store_true", help="reset budgets to 1.5x this run")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.timeout)
+        return 0
+
+    sys.path.insert(0, ROOT)
+    from odb.replay import ReplayServer
+
+    server = ReplayServer(FIXTURES, latency_ms=args.latency, bandwidth=args.bandwidth * 1024).start()
+    with open(BUDGET_FILE) as f:
+        budgets = json.load(f)
+
+    failed = False
+    summaries = {}
+    for name in args.targets or list(TARGETS):
+        try:
+            summary = summaries[name] = run(name, args.iterations, server.url, args.warm, args.timeout)
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            failed = True
+            continue
+        if args.update:
+            budgets[name] = {key: round(summary[key] * 1.5, 1)
+                             for key in METRICS + ("peak_rss_mb",) if key in summary}
+        problems = check(summary, budgets.get(name, {}))
+        status = "ok" if not problems else "OVER: " + "; ".join(problems)
+        timings = "  ".join(f"{metric} {summary[metric]:7.1f}" for metric in METRICS if metric in summary)
+        print(f"{name:<6} {timings}  rss {summary['peak_rss_mb']:6.1f} MB  {status}")
+        failed = failed or bool(problems)
+    server.stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=2)
+    if args.update:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"[INFO] Budgets written to {BUDGET_FILE}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""Import-time budget check for the entry points.
+
+Imports each module in a fresh interpreter under ``python -X importtime``
+and fails when its median cumulative import cost goes over its budget in
+import_budget.json, or when a module listed as lazy was loaded at import
+time.
+
+Budgets are what a module may add on top of a reference import measured
+on the same machine in the same run (``"over"``: requests, PyQt5, the
+cache module), so a slow disk or CPU moves both sides and only our own
+import work is held to the budget.
+
+    python3 benchmarks/import_budget.py            # check every budget
+    python3 benchmarks/import_budget.py six -n 9   # one module, more runs
+    python3 benchmarks/import_budget.py --update   # reset budgets from this run
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+UPDATE_SLACK_MS = 25
+
+
+def _importtime(code):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+        env=dict(os.environ, QT_QPA_PLATFORM="offscreen"),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{code} failed:\n{result.stderr.strip().splitlines()[-1]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented under the module that triggered them
+        entries.append((name.strip(), int(cumulative), not name[1:].startswith(" ")))
+    return entries
+
+
+_startup = None
+
+def measure(module):
+    """Return (import ms, set of newly imported module names) for one run"""
+    global _startup
+    if _startup is None:
+        # Whatever the bare interpreter loads is not the module's cost
+        _startup = {name for name, _, _ in _importtime("pass")}
+
+    total_us = 0
+    imported = set()
+    for name, cumulative, top_level in _importtime(f"import {module}"):
+        if name in _startup:
+            continue
+        imported.add(name)
+        if top_level:
+            total_us += cumulative
+    return total_us / 1000.0, imported
+
+
+def check(module, budget, runs):
+    """(median ms over the reference import, problems)"""
+    reference = budget.get("over")
+    # Warm the bytecode caches so we time imports, not compiles
+    measure(module)
+    if reference:
+        measure(reference)
+    # Each run times the reference right before the module, so drift in
+    # machine load hits both sides of the difference alike
+    extras, imported = [], set()
+    for _ in range(runs):
+        base = measure(reference)[0] if reference else 0.0
+        ms, imported = measure(module)
+        extras.append(ms - base)
+    extra = statistics.median(extras)
+
+    problems = []
+    if extra > budget["max_ms"]:
+        problems.append(f"{extra:.1f} ms over {budget.get('over') or 'nothing'} > budget {budget['max_ms']} ms")
+    for lazy in budget.get("lazy", []):
+        eager = sorted(name for name in imported if name == lazy or name.startswith(lazy + "."))
+        if eager:
+            problems.append(f"{lazy} imported eagerly")
+    return extra, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", help="modules to check (default: all)")
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="rewrite budgets from this run")
+    args = parser.parse_args()
+
+    with open(BUDGET_FILE) as f:
+        budgets = json.load(f)
+
+    failed = False
+    for module in args.modules or budgets:
+        budget = budgets.get(module, {"max_ms": float("inf")})
+        try:
+            extra, problems = check(module, budget, args.runs)
+        except RuntimeError as e:
+            print(f"[ERROR] {e}")
+            failed = True
+            continue
+        status = "FAIL" if problems else "ok"
+        over = f"(+{budget['over']})" if budget.get("over") else ""
+        print(f"{module:16} {extra:8.1f} ms {over:28} {status}  {'; '.join(problems)}")
+        if args.update:
+            # Room for run-to-run noise in both measurements
+            budgets.setdefault(module, {})["max_ms"] = int(max(extra, 0) * 2) + UPDATE_SLACK_MS
+        elif problems:
+            failed = True
+
+    if args.update:
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budgets, f, indent=4)
+            f.write("\n")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
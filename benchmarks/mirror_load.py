@@ -0,0 +1,221 @@
+"""Load test of the LAN mirror: many concurrent audio streams from its cache.
+
+Starts the mirror in a child process over the replay server and the
+fixtures, waits until every MP3 is cached, then opens ``--concurrency``
+client connections that each fetch the audio ``--requests`` times (whole
+files, or random byte ranges with ``--ranges``).  For each server loop it
+reports aggregate throughput, time to first byte and per-stream completion
+time, plus the server's peak thread count and RSS.
+
+    python3 benchmarks/mirror_load.py                      # asyncio vs threaded, 200 streams
+    python3 benchmarks/mirror_load.py async -c 500 -n 10
+    python3 benchmarks/mirror_load.py --url http://mirror-pc:8766 -c 100   # an existing mirror
+"""
+import os
+import sys
+import re
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import statistics
+import subprocess
+from urllib.parse import urljoin, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, ROOT)
+
+SERVERS = ("async", "threaded")
+READY = "MIRROR READY "
+
+# ----------------------------
+# Child: the mirror under test
+# ----------------------------
+def child(kind):
+    # Read by odb.cache at import, so set before importing the mirror
+    os.environ["ODB_CACHE_DIR"] = tempfile.mkdtemp(prefix="odb-load-")
+    from odb.replay import ReplayServer
+
+    replay = ReplayServer(FIXTURES).start()
+    os.environ["ODB_REPLAY"] = replay.url
+
+    from odb.mirror import Mirror
+
+    mirror = Mirror("127.0.0.1", 0, threaded=kind == "threaded")
+    mirror.refresh()
+    for thread in list(mirror.fills.values()):
+        thread.join()
+
+    if kind == "threaded":
+        mirror.start()
+        print(READY + mirror.url, flush=True)
+        mirror.thread.join()
+    else:
+        from odb.aiomirror import AsyncMirrorServer
+
+        async def main():
+            server = await AsyncMirrorServer(mirror, "127.0.0.1", 0).start()
+            print(READY + server.url, flush=True)
+            await server.serve_forever()
+
+        asyncio.run(main())
+
+
+def start_child(kind):
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child", kind],
+                            stdout=subprocess.PIPE, text=True)
+    for line in proc.stdout:
+        if line.startswith(READY):
+            return proc, line[len(READY):].strip()
+    raise RuntimeError(f"{kind} mirror exited before it was ready")
+
+
+def proc_status(pid):
+    """(threads, RSS in MB) of a process, or (0, 0) off Linux"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f)
+    except OSError:
+        return 0, 0.0
+    return int(fields["Threads"]), int(fields["VmRSS"].split()[0]) / 1024
+
+# ----------------------------
+# Clients
+# ----------------------------
+async def fetch_stream(host, port, path, byte_range=None):
+    """(status, seconds to first byte, seconds to last byte, bytes)"""
+    start = time.perf_counter()
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+    if byte_range:
+        request += f"Range: bytes={byte_range[0]}-{byte_range[1]}\r\n"
+    writer.write((request + "\r\n").encode("latin-1"))
+    await writer.drain()
+    head = await reader.readuntil(b"\r\n\r\n")
+    first_byte = time.perf_counter() - start
+    length = int(re.search(rb"(?i)content-length:\s*(\d+)", head).group(1))
+    received = 0
+    while received < length:
+        chunk = await reader.read(256 * 1024)
+        if not chunk:
+            break
+        received += len(chunk)
+    writer.close()
+    return int(head.split()[1]), first_byte, time.perf_counter() - start, received
+
+
+async def load(url, concurrency, requests, ranges, pid=None):
+    from odb import fetch
+
+    records = fetch.get(urljoin(url, "/devotionals.json")).json()
+    audio = [(urlsplit(urljoin(url, r["mp3_url"])).path, r["audio"]["size"]) for r in records
+             if r.get("mp3_url") and r.get("audio", {}).get("size")]
+    if not audio:
+        raise RuntimeError("the mirror lists no cached audio")
+    host, port = urlsplit(url).hostname, urlsplit(url).port or 80
+
+    results = []
+    errors = 0
+    peak = {"threads": 0, "rss_mb": 0.0}
+
+    async def client():
+        nonlocal errors
+        for _ in range(requests):
+            path, size = random.choice(audio)
+            byte_range = None
+            if ranges:
+                first = random.randrange(size)
+                byte_range = (first, min(first + random.randint(1, 64 * 1024), size) - 1)
+            try:
+                results.append(await fetch_stream(host, port, path, byte_range))
+            except (OSError, asyncio.IncompleteReadError):
+                errors += 1
+
+    async def watch():
+        while pid:
+            threads, rss = proc_status(pid)
+            peak["threads"] = max(peak["threads"], threads)
+            peak["rss_mb"] = max(peak["rss_mb"], rss)
+            await asyncio.sleep(0.1)
+
+    watcher = asyncio.ensure_future(watch())
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    watcher.cancel()
+    return summarize(results, errors, elapsed, peak)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)] * 1000 if values else 0
+
+
+def summarize(results, errors, elapsed, peak):
+    total = sum(r[3] for r in results)
+    bad = sum(1 for r in results if r[0] not in (200, 206))
+    ttfb = [r[1] for r in results]
+    done = [r[2] for r in results]
+    return {
+        "streams": len(results),
+        "errors": errors + bad,
+        "seconds": round(elapsed, 3),
+        "mb_per_s": round(total / elapsed / 2 ** 20, 1),
+        "streams_per_s": round(len(results) / elapsed, 1),
+        "ttfb_ms": {"p50": round(percentile(ttfb, 50), 1), "p95": round(percentile(ttfb, 95), 1),
+                    "max": round(percentile(ttfb, 100), 1)},
+        "stream_ms": {"p50": round(percentile(done, 50), 1), "p95": round(percentile(done, 95), 1),
+                      "max": round(percentile(done, 100), 1), "mean": round(statistics.fmean(done) * 1000, 1) if done else 0},
+        "server_threads": peak["threads"],
+        "server_rss_mb": round(peak["rss_mb"], 1),
+    }
+
+
+def print_summary(name, s):
+    print(f"{name:<9} {s['streams']:>6} streams {s['errors']:>4} errors {s['mb_per_s']:>8.1f} MB/s "
+          f"{s['streams_per_s']:>8.1f}/s  first byte p50 {s['ttfb_ms']['p50']:.1f} p95 {s['ttfb_ms']['p95']:.1f} ms  "
+          f"stream p50 {s['stream_ms']['p50']:.1f} p95 {s['stream_ms']['p95']:.1f} max {s['stream_ms']['max']:.1f} ms"
+          + (f"  server {s['server_threads']} threads {s['server_rss_mb']:.0f} MB" if s["server_threads"] else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mirror load test")
+    parser.add_argument("servers", nargs="*", help=f"server loops to test: {', '.join(SERVERS)} (default: both)")
+    parser.add_argument("-c", "--concurrency", type=int, default=200, help="simultaneous clients")
+    parser.add_argument("-n", "--requests", type=int, default=5, help="streams per client")
+    parser.add_argument("--ranges", action="store_true", help="random byte ranges instead of whole files")
+    parser.add_argument("--url", help="load an already running mirror instead")
+    parser.add_argument("--json", metavar="FILE", help="write the summaries to FILE")
+    parser.add_argument("--child", choices=SERVERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child)
+    unknown = set(args.servers) - set(SERVERS)
+    if unknown:
+        parser.error(f"unknown server loop: {', '.join(sorted(unknown))}")
+
+    summaries = {}
+    targets = [("mirror", args.url, None)] if args.url else [(kind, None, None) for kind in args.servers or SERVERS]
+    for name, url, proc in targets:
+        if url is None:
+            proc, url = start_child(name)
+        try:
+            summaries[name] = asyncio.run(load(url, args.concurrency, args.requests, args.ranges,
+                                               proc.pid if proc else None))
+        finally:
+            if proc:
+                proc.kill()
+                proc.wait()
+        print_summary(name, summaries[name])
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summaries, f, indent=2)
+    return 1 if any(s["errors"] for s in summaries.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Memory-leak harness for refreshing the six.py viewer in place.
+
+Runs offscreen against the replay server and the fixtures, calling
+``ODBViewer.refresh`` with each feed item in turn for thousands of cycles.
+RSS, live Python objects and live Qt objects are sampled as it goes.  After
+the warm-up, growth must stay within the limits or the run exits 1.
+
+    python3 benchmarks/refresh_leak.py                   # 2000 refreshes
+    python3 benchmarks/refresh_leak.py -n 10000 --every 500
+    python3 benchmarks/refresh_leak.py --rebuild -n 300  # old way: a new ODBViewer each time
+"""
+import os
+import sys
+import gc
+import argparse
+import resource
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+sys.path.insert(0, ROOT)
+
+
+def rss_mb():
+    """Current (not peak) resident set size"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def sample(app, viewer):
+    from PyQt5.QtCore import QCoreApplication, QEvent, QObject
+
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    gc.collect()
+    return {
+        "rss_mb": round(rss_mb(), 1),
+        "py_objects": len(gc.get_objects()),
+        "qt_objects": len(viewer.findChildren(QObject)) + len(app.allWidgets()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeated-refresh memory check")
+    parser.add_argument("-n", "--cycles", type=int, default=2000)
+    parser.add_argument("--every", type=int, default=100, help="sample every N cycles")
+    parser.add_argument("--warmup", type=float, default=0.1, help="fraction of cycles before the reference sample")
+    parser.add_argument("--max-rss-growth", type=float, default=10, metavar="MB")
+    parser.add_argument("--max-object-growth", type=int, default=2000, help="live Python objects")
+    parser.add_argument("--max-qt-growth", type=int, default=0, help="live Qt objects")
+    parser.add_argument("--rebuild", action="store_true", help="build a new ODBViewer per cycle instead")
+    args = parser.parse_args()
+
+    # Read by odb.cache / odb.fetch at import, so set before importing them
+    os.environ["ODB_CACHE_DIR"] = tempfile.mkdtemp(prefix="odb-leak-")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from odb.replay import ReplayServer
+
+    server = ReplayServer(FIXTURES).start()
+    os.environ["ODB_REPLAY"] = server.url
+
+    import six
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(["refresh_leak"])
+    items = six.fetch_items(7)
+    viewer = six.ODBViewer(items[0])
+    viewer.show()
+
+    reference = None
+    warmup = max(int(args.cycles * args.warmup), args.every)
+    print(f"{'cycle':>7} {'rss MB':>8} {'py objects':>11} {'qt objects':>11}")
+    for cycle in range(1, args.cycles + 1):
+        item = items[cycle % len(items)]
+        if args.rebuild:
+            viewer.close()
+            viewer.deleteLater()
+            viewer = six.ODBViewer(item)
+            viewer.show()
+        else:
+            viewer.refresh(item)
+        app.processEvents()
+
+        if cycle % args.every == 0 or cycle == warmup:
+            stats = sample(app, viewer)
+            print(f"{cycle:>7} {stats['rss_mb']:>8.1f} {stats['py_objects']:>11} {stats['qt_objects']:>11}")
+            if cycle == warmup:
+                reference = stats
+    final = sample(app, viewer)
+    server.stop()
+
+    if reference is None:
+        print("[WARNING] Too few cycles to get past the warm-up")
+        return 0
+    growth = {key: final[key] - reference[key] for key in final}
+    print(f"Growth after cycle {warmup}: {growth['rss_mb']:+.1f} MB RSS, "
+          f"{growth['py_objects']:+} Python objects, {growth['qt_objects']:+} Qt objects")
+    problems = []
+    if growth["rss_mb"] > args.max_rss_growth:
+        problems.append(f"RSS grew {growth['rss_mb']:.1f} MB")
+    if growth["py_objects"] > args.max_object_growth:
+        problems.append(f"{growth['py_objects']} more Python objects")
+    if growth["qt_objects"] > args.max_qt_growth:
+        problems.append(f"{growth['qt_objects']} more Qt objects")
+    if problems:
+        print("[ERROR] Memory is not flat: " + "; ".join(problems))
+        return 1
+    print("[INFO] Memory stayed flat")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
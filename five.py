@@ -1,8 +1,5 @@
 import sys
-import requests
-from bs4 import BeautifulSoup
 from io import BytesIO
-from PIL import Image
 import re
 from urllib.parse import urlparse, parse_qs, unquote
 
@@ -11,8 +8,13 @@ from PyQt5.QtWidgets import (
     QScrollArea, QPushButton, QHBoxLayout, QSlider
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QUrl
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from PyQt5.QtCore import Qt, QUrl, QEvent, pyqtSignal
+
+from odb import fetch
+from odb.audio_proxy import get_proxy
+from odb.mp3probe import track_info
+from odb.scheduler import TEXT, get_scheduler
+from odb.uipolicy import UpdatePolicy
 
 FEED_URL = "https://ourdailybreadministries.ca/feed/"
 
@@ -21,7 +23,9 @@ FEED_URL = "https://ourdailybreadministries.ca/feed/"
 # ----------------------------
 
 def fetch_first_item():
-    response = requests.get(FEED_URL, headers={"User-Agent": "Mozilla/5.0"})
+    from bs4 import BeautifulSoup
+
+    response = fetch.get(FEED_URL, kind="feed")
     response.raise_for_status()
     soup = BeautifulSoup(response.text, "xml")
 
@@ -49,7 +53,7 @@ def fetch_first_item():
     }
 
 def get_mp3_from_page(url):
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    response = fetch.get(url, kind="page")
     if response.status_code != 200:
         raise Exception(f"Failed to load devotional page: {response.status_code}")
 
@@ -85,6 +89,9 @@ def format_time(ms):
 # GUI Class
 # ----------------------------
 class ODBViewer(QWidget):
+    # Future of the MP3 header probe and seek index, delivered to the GUI thread
+    audio_info_ready = pyqtSignal(object)
+
     def __init__(self, data):
         super().__init__()
         self.setWindowTitle("ODB Devotional Viewer")
@@ -124,23 +131,43 @@ class ODBViewer(QWidget):
         layout.addWidget(scroll)
 
         # Audio Player
-        self.player = QMediaPlayer()
+        self.player = None
+        self.update_policy = UpdatePolicy()
+        self.seek_index = None
         self.mp3_url = get_mp3_from_page(data["link"])
         print(f"[INFO] MP3 URL assigned: {self.mp3_url}\n")
+        self.audio_meta = {}
 
-        self.create_audio_controls(layout)
-        self.player.positionChanged.connect(self.position_changed)
-        self.player.durationChanged.connect(self.duration_changed)
-
-        # Auto-play
         if self.mp3_url:
+            self.create_audio_controls(layout)
+            self.duration_changed(self.player.duration())
+            self.player.positionChanged.connect(self.position_changed)
+            self.player.durationChanged.connect(self.duration_changed)
+
+            # Probe the MP3 header and build the seek index off the GUI thread,
+            # so the duration is known before buffering
+            self.audio_info_ready.connect(self.show_audio_info)
+            future = get_scheduler().submit(TEXT, None, track_info, data, self.mp3_url)
+            future.add_done_callback(self.audio_info_ready.emit)
+
+            # Auto-play
             self.play_audio()
 
         self.setLayout(layout)
 
+    def show_audio_info(self, future):
+        try:
+            self.audio_meta, self.seek_index = future.result()
+        except Exception as e:
+            print(f"[WARNING] Could not probe MP3 header: {e}")
+            return
+        self.duration_changed(self.player.duration())
+
     def render_image(self, image_url, parent_layout):
+        from PIL import Image  # only needed when there is an image
+
         try:
-            img_data = requests.get(image_url).content
+            img_data = fetch.get(image_url, kind="image").content
             pil_img = Image.open(BytesIO(img_data))
             width = 750
             height = int(pil_img.height * (width / pil_img.width))
@@ -157,6 +184,12 @@ class ODBViewer(QWidget):
             print(f"[ERROR] Could not load image: {e}")
 
     def create_audio_controls(self, parent_layout):
+        # QtMultimedia is only loaded once there is audio to play
+        from PyQt5.QtMultimedia import QMediaPlayer
+
+        self.player = QMediaPlayer()
+        self.player.setNotifyInterval(self.update_policy.interval)
+
         # Buttons
         button_layout = QHBoxLayout()
         button_layout.setSpacing(20)
@@ -181,7 +214,7 @@ class ODBViewer(QWidget):
         self.position_label = QLabel("00:00")
         self.slider = QSlider(Qt.Horizontal)
         self.slider.setRange(0, 0)
-        self.slider.sliderMoved.connect(self.player.setPosition)
+        self.slider.sliderMoved.connect(self.seek)
         self.duration_label = QLabel("00:00")
         self.slider.setStyleSheet(
             "QSlider::groove:horizontal {height:8px; background:#ddd; border-radius:4px;}"
@@ -193,21 +226,68 @@ class ODBViewer(QWidget):
         parent_layout.addLayout(progress_layout)
 
     def play_audio(self):
+        from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+
         if self.mp3_url:
             if self.player.mediaStatus() == QMediaPlayer.NoMedia:
-                self.player.setMedia(QMediaContent(QUrl(self.mp3_url)))
+                # Play through the local proxy so seeks are served from cache
+                local_url = get_proxy().url_for(self.mp3_url)
+                self.player.setMedia(QMediaContent(QUrl(local_url)))
+                # A previously cached file knows its real duration up front
+                self.duration_changed(self.player.duration())
             self.player.play()
         else:
             print("[ERROR] No MP3 found to play.")
 
     def duration_changed(self, duration):
+        # Prefer the frame-scanned duration over the player's VBR estimate
+        if self.seek_index:
+            duration = self.seek_index.duration_ms
+        elif self.audio_meta.get("duration_ms"):
+            duration = self.audio_meta["duration_ms"]
         self.slider.setRange(0, duration)
         self.duration_label.setText(format_time(duration))
 
     def position_changed(self, position):
-        if not self.slider.isSliderDown():
+        if not self.update_policy.visible:
+            return
+        if self.seek_index:
+            position = self.seek_index.from_player(position, self.player.duration())
+        # Only move the slider when the handle would move by a pixel
+        step = max(1, self.slider.maximum() // max(self.slider.width(), 1))
+        if not self.slider.isSliderDown() and self.update_policy.changed("slider", position // step):
             self.slider.setValue(position)
-        self.position_label.setText(format_time(position))
+        text = format_time(position)
+        if self.update_policy.changed("position", text):
+            self.position_label.setText(text)
+
+    def seek(self, position):
+        if self.seek_index:
+            position = self.seek_index.to_player(position, self.player.duration())
+        self.player.setPosition(position)
+
+    # ----------------------------
+    # Low-power mode while hidden
+    # ----------------------------
+    def changeEvent(self, event):
+        if event.type() == QEvent.WindowStateChange:
+            self.visibility_changed()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.visibility_changed()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.visibility_changed()
+
+    def visibility_changed(self):
+        visible = self.isVisible() and not self.isMinimized()
+        if self.update_policy.set_visible(visible) and self.player is not None:
+            self.player.setNotifyInterval(self.update_policy.interval)
+            if visible:
+                self.position_changed(self.player.position())
 
 # ----------------------------
 # Run App
@@ -1,8 +1,6 @@
 import sys
 import requests
-from bs4 import BeautifulSoup
 from io import BytesIO
-from PIL import Image
 import re
 from urllib.parse import urlparse, parse_qs, unquote
 
@@ -11,8 +9,13 @@ from PyQt5.QtWidgets import (
     QScrollArea, QPushButton, QHBoxLayout, QSlider
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QUrl
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+from PyQt5.QtCore import Qt, QUrl, QEvent, pyqtSignal
+
+from odb import fetch
+from odb.audio_proxy import get_proxy
+from odb.mp3probe import track_info
+from odb.scheduler import TEXT, get_scheduler
+from odb.uipolicy import UpdatePolicy
 
 FEED_URL = "https://ourdailybreadministries.ca/feed/"
 
@@ -21,7 +24,9 @@ FEED_URL = "https://ourdailybreadministries.ca/feed/"
 # ----------------------------
 
 def fetch_first_item():
-    response = requests.get(FEED_URL, headers={"User-Agent": "Mozilla/5.0"})
+    from bs4 import BeautifulSoup
+
+    response = fetch.get(FEED_URL, kind="feed")
     response.raise_for_status()
     soup = BeautifulSoup(response.text, "xml")
 
@@ -49,7 +54,9 @@ def fetch_first_item():
     }
 
 def get_mp3_from_page(url):
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    from bs4 import BeautifulSoup
+
+    response = fetch.get(url, kind="page")
     if response.status_code != 200:
         raise Exception(f"Failed to load devotional page: {response.status_code}")
 
@@ -82,7 +89,7 @@ def get_mp3_from_page(url):
 
         # Fallback: fetch JSON if feed param not found (less common)
         try:
-            json_resp = requests.get(normalized_playlist_url, headers={"User-Agent": "Mozilla/5.0"}).json()
+            json_resp = fetch.get(normalized_playlist_url, kind="playlist").json()
             if "tracks" in json_resp and len(json_resp["tracks"]) > 0:
                 mp3_url = json_resp["tracks"][0].get("file")
                 if mp3_url:
@@ -114,6 +121,9 @@ def format_time(ms):
 # GUI Class
 # ----------------------------
 class ODBViewer(QWidget):
+    # Future of the MP3 header probe and seek index, delivered to the GUI thread
+    audio_info_ready = pyqtSignal(object)
+
     def __init__(self, data):
         super().__init__()
         self.setWindowTitle("ODB Devotional Viewer")
@@ -149,27 +159,47 @@ class ODBViewer(QWidget):
         layout.addWidget(scroll)
 
         # --- Audio Player Setup ---
-        self.player = QMediaPlayer()
+        self.player = None
+        self.update_policy = UpdatePolicy()
+        self.seek_index = None
         self.mp3_url = get_mp3_from_page(data["link"])
         print(f"[INFO] Direct MP3 URL assigned to player: {self.mp3_url}\n") 
+        self.audio_meta = {}
 
         # --- Audio Controls Layout ---
-        self.create_audio_controls(layout)
+        if self.mp3_url:
+            self.create_audio_controls(layout)
+            self.duration_changed(self.player.duration())
 
-        # Connect Signals for Progress Bar
-        self.player.positionChanged.connect(self.position_changed)
-        self.player.durationChanged.connect(self.duration_changed)
+            # Connect Signals for Progress Bar
+            self.player.positionChanged.connect(self.position_changed)
+            self.player.durationChanged.connect(self.duration_changed)
 
-        # Auto-play
-        if self.mp3_url:
+            # Probe the MP3 header and build the seek index off the GUI thread,
+            # so the duration is known before buffering
+            self.audio_info_ready.connect(self.show_audio_info)
+            future = get_scheduler().submit(TEXT, None, track_info, data, self.mp3_url)
+            future.add_done_callback(self.audio_info_ready.emit)
+
+            # Auto-play
             self.play_audio()
 
         self.setLayout(layout)
 
+    def show_audio_info(self, future):
+        try:
+            self.audio_meta, self.seek_index = future.result()
+        except Exception as e:
+            print(f"[WARNING] Could not probe MP3 header: {e}")
+            return
+        self.duration_changed(self.player.duration())
+
     def render_image(self, image_url, parent_layout):
         """Fetches and displays the image."""
+        from PIL import Image  # only needed when there is an image
+
         try:
-            img_data = requests.get(image_url).content
+            img_data = fetch.get(image_url, kind="image").content
             pil_img = Image.open(BytesIO(img_data))
             # Resize image to fit the layout width (e.g., 750px) while maintaining aspect ratio
             width = 750
@@ -189,6 +219,12 @@ class ODBViewer(QWidget):
 
     def create_audio_controls(self, parent_layout):
         """Sets up the buttons, slider, and time labels."""
+        # QtMultimedia is only loaded once there is audio to play
+        from PyQt5.QtMultimedia import QMediaPlayer
+
+        self.player = QMediaPlayer()
+        self.player.setNotifyInterval(self.update_policy.interval)
+
         
         # 1. Playback Buttons
         button_layout = QHBoxLayout()
@@ -213,7 +249,7 @@ class ODBViewer(QWidget):
         self.slider = QSlider(Qt.Horizontal)
         self.slider.setRange(0, 0) # Range will be set dynamically by durationChanged
         # Connect slider movement to player position
-        self.slider.sliderMoved.connect(self.player.setPosition)
+        self.slider.sliderMoved.connect(self.seek)
         
         self.duration_label = QLabel("00:00")
         
@@ -224,9 +260,15 @@ class ODBViewer(QWidget):
         parent_layout.addLayout(progress_layout)
 
     def play_audio(self):
+        from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+
         if self.mp3_url:
             if self.player.mediaStatus() == QMediaPlayer.NoMedia:
-                self.player.setMedia(QMediaContent(QUrl(self.mp3_url)))
+                # Play through the local proxy so seeks are served from cache
+                local_url = get_proxy().url_for(self.mp3_url)
+                self.player.setMedia(QMediaContent(QUrl(local_url)))
+                # A previously cached file knows its real duration up front
+                self.duration_changed(self.player.duration())
             self.player.play()
         else:
             print("[ERROR] No MP3 found to play.")
@@ -236,14 +278,57 @@ class ODBViewer(QWidget):
     # ----------------------------
     def duration_changed(self, duration):
         """Sets the maximum value of the slider."""
+        # Prefer the frame-scanned duration over the player's VBR estimate
+        if self.seek_index:
+            duration = self.seek_index.duration_ms
+        elif self.audio_meta.get("duration_ms"):
+            duration = self.audio_meta["duration_ms"]
         self.slider.setRange(0, duration)
         self.duration_label.setText(format_time(duration))
 
     def position_changed(self, position):
         """Updates the slider position and current time label."""
-        if not self.slider.isSliderDown():
+        if not self.update_policy.visible:
+            return
+        if self.seek_index:
+            position = self.seek_index.from_player(position, self.player.duration())
+        # Only move the slider when the handle would move by a pixel
+        step = max(1, self.slider.maximum() // max(self.slider.width(), 1))
+        if not self.slider.isSliderDown() and self.update_policy.changed("slider", position // step):
             self.slider.setValue(position)
-        self.position_label.setText(format_time(position))
+        text = format_time(position)
+        if self.update_policy.changed("position", text):
+            self.position_label.setText(text)
+
+    def seek(self, position):
+        """Seeks to a slider position using the MP3 seek index."""
+        if self.seek_index:
+            position = self.seek_index.to_player(position, self.player.duration())
+        self.player.setPosition(position)
+
+    # ----------------------------
+    # Low-power mode while hidden
+    # ----------------------------
+    def changeEvent(self, event):
+        if event.type() == QEvent.WindowStateChange:
+            self.visibility_changed()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.visibility_changed()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.visibility_changed()
+
+    def visibility_changed(self):
+        """Slows player notifications while hidden, catches up on restore."""
+        visible = self.isVisible() and not self.isMinimized()
+        if self.update_policy.set_visible(visible) and self.player is not None:
+            self.player.setNotifyInterval(self.update_policy.interval)
+            if visible:
+                self.position_changed(self.player.position())
 
 
 # ----------------------------
@@ -0,0 +1 @@
+"""Shared, Qt-free helpers used by the ODB devotional viewers."""
@@ -0,0 +1,5 @@
+import sys
+
+from odb.cli import main
+
+sys.exit(main())
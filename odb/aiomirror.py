@@ -0,0 +1,179 @@
+"""asyncio front end for the LAN mirror.
+
+One event loop instead of a thread per connection, so a small box can hold
+hundreds of audio streams open.  Cached bytes go from the file to the socket
+with ``loop.sendfile`` (os.sendfile where the platform has it) and never pass
+through Python buffers.  Only the feed refresh runs in a worker thread;
+streams waiting for audio that is still downloading just poll the cache.
+
+    python3 -m odb mirror              # this loop
+    python3 -m odb mirror --threaded   # the thread-per-connection server
+"""
+import asyncio
+from http import HTTPStatus
+from urllib.parse import urlsplit
+import os
+import re
+
+from odb.audio_proxy import origin_size, parse_range
+from odb.mirror import POLL_S
+
+# Idle keep-alive connections are closed after this long
+IDLE_TIMEOUT_S = 60
+MAX_HEADER_BYTES = 16 * 1024
+
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def _read_request(reader):
+    """(method, path, headers) of the next request, or None at end of stream"""
+    try:
+        data = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT_S)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+        return None
+    lines = data.decode("latin-1").split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return parts[0], parts[1], headers
+
+
+class AsyncMirrorServer:
+    """Serves a Mirror's documents, images and audio from one event loop"""
+
+    def __init__(self, mirror, host="0.0.0.0", port=0):
+        self.mirror = mirror
+        self.host = host
+        self.port = port
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port,
+                                                 limit=MAX_HEADER_BYTES)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def run(self):
+        """Block serving until interrupted"""
+        asyncio.run(self.serve_forever())
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers = request
+                if method not in ("GET", "HEAD"):
+                    await self.send(writer, 405, [("Content-Length", "0")])
+                    break
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.respond(urlsplit(target).path, headers, method == "GET", writer)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.LimitOverrunError, OSError):
+            # Client went away (or sent garbage); nothing to clean up but the socket
+            pass
+        finally:
+            writer.close()
+
+    async def send(self, writer, status, headers):
+        writer.write(_head(status, headers))
+        await writer.drain()
+
+    async def respond(self, path, headers, send_body, writer):
+        loop = asyncio.get_running_loop()
+        match = re.match(r"^/audio/([0-9a-f]+)\.mp3$", path)
+        if match:
+            return await self.respond_audio(match.group(1), headers, send_body, writer)
+
+        refresher = self.mirror.refresh_in_background()
+        if refresher is not None and self.mirror.published is None:
+            # Nothing to serve yet; the first requests wait for the first refresh
+            await loop.run_in_executor(None, refresher.join)
+        found = self.mirror.document(path, f"http://{headers.get('host') or f'{self.host}:{self.port}'}")
+        if found is None:
+            return await self.send(writer, 404, [("Content-Length", "0")])
+        content_type, etag, body, file_path = found
+        if etag in headers.get("if-none-match", ""):
+            return await self.send(writer, 304, [("ETag", etag), ("Content-Length", "0")])
+
+        size = len(body) if body is not None else os.path.getsize(file_path)
+        status, start, end = await self.send_range_head(writer, headers, size, content_type, [("ETag", etag)])
+        if not send_body or start == end:
+            return
+        if body is not None:
+            writer.write(memoryview(body)[start:end])
+            await writer.drain()
+        else:
+            with open(file_path, "rb") as f:
+                await loop.sendfile(writer.transport, f, start, end - start)
+
+    async def respond_audio(self, key, headers, send_body, writer):
+        loop = asyncio.get_running_loop()
+        origin_url, cached = self.mirror.cache_file(key)
+        if cached is None:
+            return await self.send(writer, 404, [("Content-Length", "0")])
+        size = cached.size
+        if size is None:
+            try:
+                size = await loop.run_in_executor(None, origin_size, origin_url, cached)
+            except Exception as e:
+                print(f"[ERROR] Mirror could not reach origin: {e}")
+            if size is None:
+                return await self.send(writer, 502, [("Content-Length", "0")])
+
+        status, start, end = await self.send_range_head(writer, headers, size, "audio/mpeg")
+        pos = start
+        while send_body and pos < end:
+            available = cached.available(pos)
+            if not available:
+                if not await self.wait_for(origin_url, cached, pos):
+                    # Headers are out; all we can do is cut the response short
+                    raise ConnectionError(f"download of {origin_url} failed at byte {pos}")
+                continue
+            length = min(available, end - pos)
+            with cached.open() as f:
+                await loop.sendfile(writer.transport, f, pos, length)
+            pos += length
+
+    async def send_range_head(self, writer, headers, size, content_type, extra=()):
+        """Send the status line and headers for a (possibly ranged) body"""
+        status, start, end = parse_range(headers.get("range"), size)
+        fields = [("Content-Type", content_type), ("Accept-Ranges", "bytes"),
+                  ("Content-Length", str(end - start))]
+        if status == 416:
+            fields.append(("Content-Range", f"bytes */{size}"))
+        elif status == 206:
+            fields.append(("Content-Range", f"bytes {start}-{end - 1}/{size}"))
+        await self.send(writer, status, fields + list(extra))
+        return status, start, end
+
+    async def wait_for(self, origin_url, cached, pos):
+        """Like Mirror.wait_for, but yields to the loop instead of blocking"""
+        for attempt in range(2):
+            thread = self.mirror.fill_audio(origin_url)
+            while thread is not None and thread.is_alive() and not cached.available(pos):
+                await asyncio.sleep(POLL_S)
+            if cached.available(pos):
+                return True
+        return False
@@ -0,0 +1,227 @@
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from odb import bandwidth, fetch, netmetrics
+from odb.cache import cache_path, parse_range, partial_file, url_key
+from odb.scheduler import PREFETCH, get_scheduler
+
+CHUNK_SIZE = 64 * 1024
+
+# ----------------------------
+# Filling the cache from the origin
+# ----------------------------
+def origin_size(origin_url, cached):
+    """Learn the total size of the file, asking the origin if needed"""
+    if cached.size is None:
+        response = fetch.get(origin_url, kind="audio", headers={"Range": "bytes=0-0"}, stream=True)
+        response.close()
+        content_range = response.headers.get("Content-Range", "")
+        if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+            cached.set_size(int(content_range.rsplit("/", 1)[1]))
+        elif response.headers.get("Content-Length"):
+            cached.set_size(int(response.headers["Content-Length"]))
+    return cached.size
+
+def fetch_range(origin_url, cached, start, end, out=None, token=None):
+    """Download bytes [start, end) into the cache, copying them to ``out``.
+
+    Stops (keeping what arrived) when ``token`` is cancelled.
+    """
+    headers = {"Range": f"bytes={start}-{end - 1}"}
+    response = fetch.get(origin_url, kind="audio", headers=headers, stream=True)
+    closer = token.on_cancel(response.close) if token is not None else None
+    try:
+        response.raise_for_status()
+        # Origins that ignore Range send the whole file from byte 0
+        pos = start if response.status_code == 206 else 0
+        for chunk in response.iter_content(CHUNK_SIZE):
+            cached.write(pos, chunk)
+            lo, hi = max(pos, start), min(pos + len(chunk), end)
+            if out is not None and lo < hi:
+                out.write(chunk[lo - pos:hi - pos])
+            pos += len(chunk)
+            bandwidth.get_limiter().pace(len(chunk), token)
+            if pos >= end or (token is not None and token.cancelled):
+                break
+    finally:
+        if closer is not None:
+            token.remove(closer)
+        response.close()
+
+def fill(origin_url, cached, token=None):
+    """Download every missing byte of ``cached``; errors are reported, not raised"""
+    try:
+        size = origin_size(origin_url, cached)
+        for gap_start, gap_end in cached.missing(0, size):
+            if token is not None and token.cancelled:
+                break
+            fetch_range(origin_url, cached, gap_start, gap_end, token=token)
+    except Exception as e:
+        if token is None or not token.cancelled:
+            print(f"[ERROR] Could not download {origin_url}: {e}")
+    if token is not None and token.cancelled and not cached.complete:
+        print(f"[INFO] Download cancelled: {origin_url}")
+    return cached.complete
+
+def download_audio(origin_url):
+    """Fill the audio cache for a URL without starting the proxy"""
+    return fill(origin_url, partial_file(cache_path(origin_url)))
+
+def send_cached(cached, offset, length, out, sock=None):
+    """Copy cached bytes to a client: zero-copy via ``sock`` if given"""
+    if sock is not None:
+        out.flush()
+        cached.sendfile(sock, offset, length)
+        return
+    end = offset + length
+    while offset < end:
+        chunk = min(CHUNK_SIZE, end - offset)
+        out.write(cached.read(offset, chunk))
+        offset += chunk
+
+# ----------------------------
+# Localhost caching proxy for QMediaPlayer
+# ----------------------------
+class AudioProxy:
+    """Serves remote MP3s to QMediaPlayer from a local cache file.
+
+    Byte ranges that are already on disk are served straight from the cache;
+    missing ranges are fetched from the origin and written to disk as they
+    stream through, so a stream that plays to the end leaves a complete
+    cached copy behind.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, handler=None, listen=True):
+        self.sources = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+        if listen:
+            self.server = ThreadingHTTPServer((host, port), handler or _ProxyHandler)
+            self.server.daemon_threads = True
+            self.server.proxy = self
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def url_for(self, origin_url):
+        """Local URL that QMediaPlayer should play instead of ``origin_url``"""
+        key = url_key(origin_url)
+        with self.lock:
+            self.sources[key] = origin_url
+        return f"http://127.0.0.1:{self.port}/audio/{key}.mp3"
+
+    def cache_file(self, key):
+        with self.lock:
+            origin_url = self.sources.get(key)
+            if origin_url is None:
+                return None, None
+        return origin_url, partial_file(cache_path(origin_url))
+
+    def prefetch(self, origin_url, priority=PREFETCH, token=None):
+        """Download the whole file into the cache through the download scheduler.
+
+        Returns a Future whose result is True once the file is complete.
+        """
+        self.url_for(origin_url)
+        _, cached = self.cache_file(url_key(origin_url))
+        return get_scheduler().submit(priority, token, fill, origin_url, cached, token)
+
+    def stream(self, origin_url, cached, start, end, out, sock=None):
+        """Write bytes [start, end) to ``out``, filling gaps from the origin.
+
+        Cached bytes go straight from disk to ``sock`` when it is given.
+        """
+        pos = start
+        from_cache = 0
+        for gap_start, gap_end in cached.missing(start, end) + [(end, end)]:
+            if pos < gap_start:
+                send_cached(cached, pos, gap_start - pos, out, sock)
+                from_cache += gap_start - pos
+                pos = gap_start
+            if gap_start < gap_end:
+                fetch_range(origin_url, cached, gap_start, gap_end, out)
+                pos = gap_end
+        if from_cache:
+            netmetrics.record_cache("audio", origin_url, hit=True, size=from_cache)
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        proxy = self.server.proxy
+        match = re.match(r"^/audio/([0-9a-f]+)\.mp3$", urlsplit(self.path).path)
+        origin_url, cached = proxy.cache_file(match.group(1)) if match else (None, None)
+        if cached is None:
+            self.send_error(404)
+            return
+
+        try:
+            size = origin_size(origin_url, cached)
+        except Exception as e:
+            print(f"[ERROR] Audio proxy could not reach origin: {e}")
+            size = None
+        if size is None:
+            self.send_error(502)
+            return
+
+        status, start, end = parse_range(self.headers.get("Range"), size)
+        if status == 416:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if status == 206:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start))
+        self.end_headers()
+
+        if send_body:
+            try:
+                proxy.stream(origin_url, cached, start, end, self.wfile, self.connection)
+            except (BrokenPipeError, ConnectionResetError):
+                # Player seeked or stopped; what we downloaded stays cached
+                pass
+            except Exception as e:
+                print(f"[ERROR] Audio proxy stream failed: {e}")
+                self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+_proxy = None
+
+def get_proxy():
+    """Return the running process-wide audio proxy, starting it on first use"""
+    global _proxy
+    if _proxy is None:
+        _proxy = AudioProxy().start()
+    return _proxy
@@ -0,0 +1,132 @@
+"""Token-bucket bandwidth limits for foreground and background transfers.
+
+Foreground is whatever someone is looking at: the feed, the page, the image
+on screen and the audio being played.  Background is work nobody is waiting
+for: prefetching the next track, ``python3 -m odb prefetch`` backfills and
+their images.  Code runs as background inside ``with background():``;
+scheduler jobs of the PREFETCH class always do.
+
+Each side has its own budget in KiB/s (0 = unlimited):
+
+    ODB_FG_KBPS=0 ODB_BG_KBPS=64 python3 six.py
+
+and background transfers also pause outright while any foreground request
+is in flight, so a prefetch never competes with the page or the audio that
+is playing.  Limits only apply within one process.
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+FOREGROUND_KBPS = float(os.environ.get("ODB_FG_KBPS", "0"))
+BACKGROUND_KBPS = float(os.environ.get("ODB_BG_KBPS", "0"))
+# A bucket holds this many seconds of its rate, so short bursts go at full speed
+BURST_S = 1.0
+# Longest single sleep, so cancelled transfers notice promptly
+SLICE_S = 0.1
+
+_local = threading.local()
+
+
+class TokenBucket:
+    """``rate`` bytes per second, ``rate * BURST_S`` of them available at once"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.capacity = rate * BURST_S
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, nbytes):
+        """Spend ``nbytes``; returns how long the caller must wait to stay under the rate"""
+        if self.rate <= 0:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Going into debt queues concurrent callers behind each other
+            self.tokens -= nbytes
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class Limiter:
+    """The foreground and background budgets of this process"""
+
+    def __init__(self, foreground_kbps=FOREGROUND_KBPS, background_kbps=BACKGROUND_KBPS):
+        self.buckets = {
+            "foreground": TokenBucket(foreground_kbps * 1024),
+            "background": TokenBucket(background_kbps * 1024),
+        }
+        self.limits = {"foreground": foreground_kbps, "background": background_kbps}
+        self.cond = threading.Condition()
+        self.active = 0  # foreground requests in flight
+        self.stats = {side: {"bytes": 0, "throttled_s": 0.0, "paused_s": 0.0}
+                      for side in self.buckets}
+
+    def begin_foreground(self):
+        with self.cond:
+            self.active += 1
+
+    def end_foreground(self):
+        with self.cond:
+            self.active -= 1
+            if not self.active:
+                self.cond.notify_all()
+
+    def wait_idle(self, token=None):
+        """Block a background transfer while foreground requests are in flight"""
+        started = time.monotonic()
+        with self.cond:
+            while self.active and not (token is not None and token.cancelled):
+                self.cond.wait(SLICE_S)
+        paused = time.monotonic() - started
+        if paused > 0.001:
+            self._count("background", paused_s=paused)
+
+    def pace(self, nbytes, token=None):
+        """Account for ``nbytes`` just read, sleeping as long as the budget needs"""
+        side = "background" if is_background() else "foreground"
+        if side == "background":
+            self.wait_idle(token)
+        delay = self.buckets[side].take(nbytes)
+        self._count(side, bytes=nbytes, throttled_s=delay)
+        deadline = time.monotonic() + delay
+        while not (token is not None and token.cancelled):
+            left = deadline - time.monotonic()
+            if left <= 0:
+                break
+            time.sleep(min(left, SLICE_S))
+
+    def _count(self, side, **amounts):
+        with self.cond:
+            for name, amount in amounts.items():
+                self.stats[side][name] += amount
+
+    def snapshot(self):
+        with self.cond:
+            return {side: dict(stats, limit_kbps=self.limits[side])
+                    for side, stats in self.stats.items()}
+
+
+@contextmanager
+def background():
+    """Run the block's transfers against the background budget"""
+    previous = getattr(_local, "background", False)
+    _local.background = True
+    try:
+        yield
+    finally:
+        _local.background = previous
+
+def is_background():
+    return getattr(_local, "background", False)
+
+
+_limiter = Limiter()
+
+def get_limiter():
+    """The process-wide limiter"""
+    return _limiter
@@ -0,0 +1,203 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from urllib.parse import urlparse
+
+CACHE_DIR = os.environ.get(
+    "ODB_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "odb")
+)
+
+# ----------------------------
+# Paths
+# ----------------------------
+def cache_dir(*parts):
+    """Return (and create) a directory inside the cache"""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def url_key(url):
+    """Stable short key for a URL"""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20]
+
+def cache_path(url, kind="audio"):
+    """Path of the cached copy of a URL, keeping its file extension"""
+    ext = os.path.splitext(urlparse(url).path)[1] or ".bin"
+    return os.path.join(cache_dir(kind), url_key(url) + ext)
+
+# ----------------------------
+# Partially downloaded files
+# ----------------------------
+class PartialFile:
+    """A cache file that is filled in byte ranges, in any order.
+
+    Data lives in ``<path>.part`` and the downloaded ranges in
+    ``<path>.ranges``; once every byte is present the part file is renamed
+    to ``path``.
+    """
+
+    def __init__(self, path, size=None):
+        self.path = path
+        self.part_path = path + ".part"
+        self.meta_path = path + ".ranges"
+        self.lock = threading.Lock()
+        self.size = size
+        self.ranges = []  # sorted, non-overlapping [start, end) pairs
+
+        if os.path.exists(path):
+            self.size = os.path.getsize(path)
+            self.ranges = [[0, self.size]]
+        elif os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path) as f:
+                    meta = json.load(f)
+                self.size = meta.get("size", size)
+                self.ranges = meta.get("ranges", [])
+            except (OSError, ValueError):
+                self.ranges = []
+
+    @property
+    def complete(self):
+        return os.path.exists(self.path)
+
+    def set_size(self, size):
+        with self.lock:
+            if self.size is None:
+                self.size = size
+                self._save_meta()
+
+    def missing(self, start, end):
+        """Return the [start, end) gaps not yet downloaded"""
+        with self.lock:
+            gaps = []
+            pos = start
+            for r_start, r_end in self.ranges:
+                if r_end <= pos:
+                    continue
+                if r_start >= end:
+                    break
+                if r_start > pos:
+                    gaps.append((pos, r_start))
+                pos = max(pos, r_end)
+            if pos < end:
+                gaps.append((pos, end))
+            return gaps
+
+    def available(self, start):
+        """Number of contiguous bytes already on disk from ``start``"""
+        with self.lock:
+            for r_start, r_end in self.ranges:
+                if r_start <= start < r_end:
+                    return r_end - start
+            return 0
+
+    def open(self):
+        """Binary file over the bytes so far (the part file until complete)"""
+        try:
+            return open(self.path if self.complete else self.part_path, "rb")
+        except FileNotFoundError:
+            # Completed (renamed) in between
+            return open(self.path, "rb")
+
+    def read(self, offset, length):
+        with self.open() as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def sendfile(self, sock, offset, length):
+        """Send bytes straight from disk to a socket (os.sendfile where available)"""
+        with self.open() as f:
+            sock.sendfile(f, offset, length)
+
+    def write(self, offset, data):
+        """Store ``data`` at ``offset`` and record the range as downloaded"""
+        if not data:
+            return
+        with self.lock:
+            # Another writer may have finished the file while we waited
+            if self.complete:
+                return
+            # Created if missing, never truncated: other ranges are already in it
+            with open(os.open(self.part_path, os.O_RDWR | os.O_CREAT, 0o644), "r+b") as f:
+                f.seek(offset)
+                f.write(data)
+            self._add_range(offset, offset + len(data))
+            if self.size is not None and self.ranges == [[0, self.size]]:
+                os.replace(self.part_path, self.path)
+                if os.path.exists(self.meta_path):
+                    os.remove(self.meta_path)
+            else:
+                self._save_meta()
+
+    def _add_range(self, start, end):
+        merged = []
+        for r_start, r_end in self.ranges:
+            if r_end < start or r_start > end:
+                merged.append([r_start, r_end])
+            else:
+                start, end = min(start, r_start), max(end, r_end)
+        merged.append([start, end])
+        merged.sort()
+        self.ranges = merged
+
+    def _save_meta(self):
+        with open(self.meta_path, "w") as f:
+            json.dump({"size": self.size, "ranges": self.ranges}, f)
+
+_partial_files = {}
+_partial_lock = threading.Lock()
+
+def partial_file(path):
+    """The process-wide PartialFile for ``path``.
+
+    Everything that reads or fills a cache file goes through here, so there
+    is one lock and one range list per file.
+    """
+    with _partial_lock:
+        if path not in _partial_files:
+            _partial_files[path] = PartialFile(path)
+        return _partial_files[path]
+
+def parse_range(header, size):
+    """(status, start, end) for a Range header: 200, 206, or 416 if unsatisfiable.
+
+    Ranges we cannot serve as one piece (several ranges, last before first)
+    are ignored, as RFC 9110 allows: the whole body is sent with a 200.
+    """
+    match = re.match(r"bytes=(\d*)-(\d*)$", header or "")
+    if not match or match.groups() == ("", ""):
+        return 200, 0, size
+    first, last = match.groups()
+    start, end = 0, size
+    if first:
+        start = int(first)
+        if last and int(last) < start:
+            return 200, 0, size
+        end = min(int(last) + 1, size) if last else size
+    elif last:
+        start = max(size - int(last), 0)
+    if start >= size:
+        return 416, 0, 0
+    return 206, start, end
+
+# ----------------------------
+# Devotional records
+# ----------------------------
+def load_record(link):
+    """Cached record for a devotional page, or an empty dict"""
+    path = os.path.join(cache_dir("records"), url_key(link) + ".json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_record(link, record):
+    """Store a devotional record (written atomically)"""
+    path = os.path.join(cache_dir("records"), url_key(link) + ".json")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(record, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,204 @@
+"""Headless command line interface: fetch, extract, cache, print.
+
+    python3 -m odb today                 # today's devotional as text
+    python3 -m odb today --json --days 2 # today plus two earlier days as JSON
+    python3 -m odb prefetch --days 6     # also cache audio, image and metadata
+    python3 -m odb metrics --har run.har # network timings of the last run
+    python3 -m odb replay --latency 200  # serve recorded responses (ODB_REPLAY)
+    python3 -m odb mirror --days 6       # LAN mirror for six.py --mirror
+
+Never imports PyQt5, so it is cheap enough for servers and cron jobs.
+"""
+import os
+import sys
+import json
+import argparse
+import contextlib
+
+from odb import bandwidth, fetch, netmetrics, sources, trace
+from odb.cache import cache_dir, cache_path, load_record, save_record
+from odb.extract import page_details
+from odb.feed import FEED_URL, fetch_items
+
+
+def collect(days, feed_url=None):
+    """Fetch today plus ``days`` earlier devotionals and cache their records.
+
+    Without ``feed_url`` the WordPress and API feeds are raced (odb.sources).
+    """
+    if feed_url:
+        items = fetch_items(days + 1, feed_url)
+    else:
+        items = sources.fetch_items(days + 1)
+    records = []
+    for item in items:
+        record = load_record(item["link"])
+        record.update(item)
+        try:
+            record.update(page_details(item["link"]))
+        except Exception as e:
+            print(f"[WARNING] Could not extract {item['link']}: {e}")
+        save_record(item["link"], record)
+        records.append(record)
+    return records
+
+
+def prefetch(record):
+    """Cache a devotional's audio, audio metadata and image"""
+    from odb.audio_proxy import download_audio
+    from odb.mp3probe import audio_metadata
+
+    if record.get("mp3_url"):
+        record["audio"] = audio_metadata(record, record["mp3_url"])
+        if download_audio(record["mp3_url"]):
+            print(f"[INFO] Cached audio: {record['title']}")
+        save_record(record["link"], dict(load_record(record["link"]), **record))
+
+    if record.get("image"):
+        path = cache_path(record["image"], "images")
+        if not os.path.exists(path):
+            response = fetch.get(record["image"], kind="image")
+            response.raise_for_status()
+            with open(path + ".tmp", "wb") as f:
+                f.write(response.content)
+            os.replace(path + ".tmp", path)
+            print(f"[INFO] Cached image: {record['title']}")
+
+
+def print_record(record):
+    print(record["title"])
+    print(f"By: {record['creator']}")
+    print(record["pubDate"])
+    print(record["link"])
+    for label, key in (("Audio", "mp3_url"), ("Image", "image"),
+                       ("Bible in 1 Year", "bible_in_one_year"), ("Bible link", "bible_link")):
+        if record.get(key):
+            print(f"{label}: {record[key]}")
+    print()
+
+
+def print_metrics(snap):
+    """Per-kind summary of a network metrics snapshot"""
+    print(f"{snap['requests']} requests, {snap['wire_bytes']} bytes on the wire, "
+          f"{snap['decoded_bytes']} decoded")
+    for kind, stats in sorted(snap["by_kind"].items()):
+        print(f"  {kind:<10} {stats['requests']:>4} requests {stats['errors']:>3} errors "
+              f"{stats['wire_bytes']:>10} bytes {stats['total_ms']:>9.1f} ms")
+    cache = snap["cache"]
+    print(f"Cache: {cache['hits']} hits, {cache['misses']} misses, "
+          f"{cache['bytes_from_cache']} bytes served locally")
+    coalesced = snap.get("coalesced", {})
+    shared = ", ".join(f"{count} {kind}" for kind, count in sorted(coalesced.items())) or "none"
+    print(f"Shared in flight: {shared}; duplicate downloads: {snap.get('duplicates', 0)}")
+    for side, stats in sorted(snap.get("bandwidth", {}).items()):
+        limit = f"{stats['limit_kbps']:g} KiB/s" if stats["limit_kbps"] else "unlimited"
+        print(f"Bandwidth {side:<10} {limit:>14} {stats['bytes']:>10} bytes "
+              f"throttled {stats['throttled_s']:.1f}s paused {stats['paused_s']:.1f}s")
+    for entry in snap["entries"]:
+        timings = entry.get("timings", {})
+        phases = " ".join(f"{k}={v:.1f}" for k, v in timings.items() if v >= 0)
+        print(f"  {entry.get('status', 0):>3} {entry['kind']:<10} {entry.get('total_ms', 0):>8.1f} ms "
+              f"{entry['url']} {phases}")
+
+
+def metrics(har=None):
+    snap = netmetrics.load_last()
+    if snap is None:
+        print("[ERROR] No network metrics recorded yet.")
+        return 1
+    print_metrics(snap)
+    if har:
+        with open(har, "w") as f:
+            json.dump(netmetrics.to_har(snap), f, indent=1)
+        print(f"[INFO] HAR written to {har}")
+    return 0
+
+
+def replay(args):
+    """Run the record/replay stand-in server until interrupted"""
+    from odb.replay import ReplayServer
+
+    root = args.dir or cache_dir("replay")
+    server = ReplayServer(root, port=args.port or 8765, latency_ms=args.latency,
+                          bandwidth=args.bandwidth * 1024, record=args.record)
+    print(f"[INFO] Replaying {root} ({len(server.store.index)} responses) on {server.url}")
+    print(f"[INFO] Point the apps at it with ODB_REPLAY={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def mirror(args):
+    """Run the LAN mirror until interrupted"""
+    from odb.mirror import PORT, MIRROR_DAYS, Mirror
+
+    port = args.port or PORT
+    server = Mirror(args.host, port, args.days or MIRROR_DAYS, args.feed or FEED_URL, threaded=args.threaded)
+    try:
+        server.refresh()
+    except Exception as e:
+        print(f"[ERROR] Could not fetch the feed yet: {e}")
+    print(f"[INFO] Mirror listening on {args.host}:{port}")
+    print(f"[INFO] Point the viewers at it with six.py --mirror http://<this machine>:{port}")
+    try:
+        if args.threaded:
+            server.serve_forever()
+        else:
+            from odb.aiomirror import AsyncMirrorServer
+
+            AsyncMirrorServer(server, args.host, port).run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python3 -m odb", description="Our Daily Bread, headless")
+    parser.add_argument("command", choices=["today", "prefetch", "metrics", "replay", "mirror"])
+    parser.add_argument("--days", type=int, default=0, help="include this many earlier days")
+    parser.add_argument("--json", action="store_true", help="print records as JSON")
+    parser.add_argument("--feed", help="read only this feed (default: race the WordPress and API feeds)")
+    parser.add_argument("--trace", metavar="FILE", help="write a Chrome trace to FILE")
+    parser.add_argument("--har", metavar="FILE", help="metrics: also export the last run as HAR")
+    parser.add_argument("--dir", help="replay: recorded responses (default ~/.cache/odb/replay)")
+    parser.add_argument("--port", type=int, help="replay/mirror: port to listen on (default 8765/8766)")
+    parser.add_argument("--host", default="0.0.0.0", help="mirror: address to listen on")
+    parser.add_argument("--threaded", action="store_true",
+                        help="mirror: a thread per connection instead of the asyncio loop")
+    parser.add_argument("--latency", type=int, default=0, metavar="MS", help="replay: delay per response")
+    parser.add_argument("--bandwidth", type=int, default=0, metavar="KBPS",
+                        help="replay: KiB/s per response (0 = unlimited)")
+    parser.add_argument("--record", action="store_true", help="replay: fetch and keep what is missing")
+    args = parser.parse_args(argv)
+    if args.command == "metrics":
+        return metrics(args.har)
+    if args.command == "replay":
+        return replay(args)
+    if args.command == "mirror":
+        return mirror(args)
+    if args.trace:
+        trace.enable(args.trace)
+
+    # Progress messages go to stderr so --json output stays parseable
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        try:
+            records = collect(args.days, args.feed)
+            if args.command == "prefetch":
+                # Backfills are background work: they yield to anything
+                # interactive and stay under ODB_BG_KBPS
+                with bandwidth.background():
+                    for record in records:
+                        prefetch(record)
+        except Exception as e:
+            print("[ERROR]", e)
+            return 1
+
+    if args.json:
+        json.dump(records, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for record in records:
+            print_record(record)
+    return 0
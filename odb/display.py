@@ -0,0 +1,30 @@
+from io import BytesIO
+
+# Hero images are scaled to this width before becoming a QPixmap
+IMAGE_WIDTH = 750
+
+# ----------------------------
+# Display helpers (Qt-free)
+# ----------------------------
+def format_time(ms):
+    s = int(ms / 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    if h > 0:
+        return f"{h:02}:{m:02}:{s:02}"
+    else:
+        return f"{m:02}:{s:02}"
+
+def scale_image(img_data, width=IMAGE_WIDTH):
+    """PNG bytes of an image scaled to ``width``, keeping its aspect ratio"""
+    from PIL import Image  # only needed when there is an image
+
+    pil_img = Image.open(BytesIO(img_data))
+    if pil_img.width == width and pil_img.format == "PNG":
+        # Already scaled (e.g. by a LAN mirror)
+        return img_data
+    height = int(pil_img.height * (width / pil_img.width))
+    pil_img = pil_img.resize((width, height))
+    img_buffer = BytesIO()
+    pil_img.save(img_buffer, format="PNG")
+    return img_buffer.getvalue()
@@ -0,0 +1,131 @@
+import re
+from urllib.parse import urlparse, parse_qs, unquote
+
+from odb import fetch, netmetrics
+from odb.singleflight import SingleFlight
+from odb.trace import span, traced
+
+PLAYLIST_RE = re.compile(r'https://ourdailybreadministries\.ca/\?load=playlist\.json[^\s"\']+')
+MP3_RE = re.compile(r'https?://[^\s"]+\.mp3')
+
+# A page's details are reused for this long, so the MP3, Bible link and
+# reading lookups for one devotional cost one download and one parse
+PAGE_TTL_S = 60
+_pages = SingleFlight(ttl=PAGE_TTL_S)
+
+
+class PageError(Exception):
+    """A devotional page could not be downloaded"""
+
+# ----------------------------
+# Devotional page
+# ----------------------------
+def fetch_page(url):
+    """HTML of a devotional page"""
+    with span("page download", url=url):
+        response = fetch.get(url, kind="page")
+    if response.status_code != 200:
+        raise PageError(f"Failed to load devotional page: {response.status_code}")
+    return response.text
+
+def extract_mp3(html, soup=None):
+    """Find the direct MP3 URL in a devotional page"""
+    # 1. <audio> tag
+    if soup is None:
+        from bs4 import BeautifulSoup
+
+        with span("page parse"):
+            soup = BeautifulSoup(html, "html.parser")
+    audio_tag = soup.find("audio")
+    if audio_tag and audio_tag.get("src"):
+        return audio_tag.get("src")
+
+    # 2. playlist.json URL, whose 'feed' parameter is the MP3
+    match = PLAYLIST_RE.search(html)
+    if match:
+        playlist_url = match.group(0).replace("&#038;", "&")
+        qs = parse_qs(urlparse(playlist_url).query)
+        if "feed" in qs and qs["feed"]:
+            return unquote(qs["feed"][0])
+
+        # Fetch the playlist itself if the parameter is missing
+        try:
+            playlist = fetch.get(playlist_url, kind="playlist").json()
+            if playlist.get("tracks") and playlist["tracks"][0].get("file"):
+                return playlist["tracks"][0]["file"]
+        except ValueError:
+            print("[WARNING] Could not decode playlist JSON.")
+
+    # 3. Any .mp3 link at all
+    match = MP3_RE.search(html)
+    if match:
+        return match.group(0)
+    return None
+
+def extract_bible_link(soup):
+    """Bible in 1 Year link from a parsed page"""
+    div = soup.find("div", class_="bible-link-box")
+    if div:
+        a_tag = div.find("a")
+        if a_tag and "bible" in a_tag.text.lower() and a_tag.get("href"):
+            return a_tag.get("href").strip()
+    return None
+
+def extract_bible_in_one_year(soup):
+    """Bible in 1 Year reading text from a parsed page"""
+    element = soup.find(class_="bible-link-box")
+    if element:
+        return element.get_text(strip=True)
+    return None
+
+def extract_page(html):
+    """Everything the viewers need from a devotional page, in one parse"""
+    from bs4 import BeautifulSoup
+
+    with span("page parse"):
+        soup = BeautifulSoup(html, "html.parser")
+    return {
+        "mp3_url": extract_mp3(html, soup),
+        "bible_link": extract_bible_link(soup),
+        "bible_in_one_year": extract_bible_in_one_year(soup),
+    }
+
+# ----------------------------
+# URL based helpers
+# ----------------------------
+def page_details(url):
+    """extract_page(fetch_page(url)), shared between concurrent and back-to-back callers"""
+    details, shared = _pages.do(url, lambda: extract_page(fetch_page(url)))
+    if shared:
+        netmetrics.record_coalesced("page-parse")
+    return dict(details)
+
+@traced()
+def get_mp3_from_page(url):
+    """Extract the direct MP3 URL from the devotional page"""
+    try:
+        mp3_url = page_details(url)["mp3_url"]
+    except Exception as e:
+        print(f"[ERROR] Could not read devotional page: {e}")
+        return None
+    if mp3_url:
+        print(f"[INFO] Direct MP3 URL: {mp3_url}")
+    else:
+        print("[ERROR] Could not find MP3 URL")
+    return mp3_url
+
+@traced()
+def get_bible_link(url):
+    """Fetch Bible in 1 Year link if available"""
+    try:
+        return page_details(url)["bible_link"]
+    except Exception:
+        return None
+
+@traced()
+def get_bible_in_one_year(url):
+    """Fetch Bible in 1 Year reading if available"""
+    try:
+        return page_details(url)["bible_in_one_year"]
+    except Exception:
+        return None
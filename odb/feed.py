@@ -0,0 +1,96 @@
+from odb import fetch
+from odb.trace import span, traced
+
+FEED_URL = "https://ourdailybreadministries.ca/feed/"
+API_FEED_URL = "https://api.experience.odb.org/devotionals/feed/?country=CA"
+
+# (ETag, Last-Modified) of the last full download of each feed, so later
+# polls can be conditional
+last_validators = {}
+
+# ----------------------------
+# RSS feed
+# ----------------------------
+@traced()
+def fetch_first_item():
+    """Fetch the first item from the feed"""
+    return fetch_items(1)[0]
+
+@traced()
+def fetch_items(count, feed_url=FEED_URL):
+    """Fetch the newest ``count`` items from the feed (today first)"""
+    with span("feed download", url=feed_url):
+        response = fetch.get(feed_url, kind="feed")
+        response.raise_for_status()
+    last_validators[feed_url] = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    with span("feed parse", bytes=len(response.content)):
+        return parse_feed(response.text, count)
+
+def parse_feed(text, count):
+    """The first ``count`` devotionals of a WordPress RSS document"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(text, "xml")
+    items = soup.find_all("item", limit=count)
+    if not items:
+        raise Exception("No items found in feed.")
+    return [parse_item(item) for item in items]
+
+def parse_item(item):
+    """Turn one feed <item> into a devotional dict"""
+    from bs4 import BeautifulSoup
+
+    title = item.find("title").text.strip()
+    link = item.find("link").text.strip()
+    guid_tag = item.find("guid")
+    guid = guid_tag.text.strip() if guid_tag else link
+    pubDate = item.find("pubDate").text.strip()
+    creator_tag = item.find("dc:creator")
+    creator = creator_tag.text.strip() if creator_tag else "Unknown"
+    description_tag = item.find("description")
+    description = description_tag.text.strip() if description_tag else ""
+
+    # Image from the description HTML...
+    img_tag = BeautifulSoup(description, "html.parser").find("img")
+    image_url = img_tag["src"] if img_tag else None
+
+    # ...overridden by <img class='today-img'> in the full content
+    content_tag = item.find("content:encoded")
+    if content_tag:
+        img_tag = BeautifulSoup(content_tag.text, "html.parser").find("img", class_="today-img")
+        if img_tag and img_tag.get("src"):
+            image_url = img_tag.get("src")
+
+    return {
+        "title": title,
+        "creator": creator,
+        "pubDate": pubDate,
+        "link": link,
+        "guid": guid,
+        "description": description,
+        "image": image_url
+    }
+
+# ----------------------------
+# ODB API feed (one.py)
+# ----------------------------
+def parse_api_feed(content, count=1):
+    """The first ``count`` devotionals of the api.experience.odb.org feed"""
+    import xml.etree.ElementTree as ET
+
+    items = ET.fromstring(content).findall("./channel/item")[:count]
+    if not items:
+        raise Exception("No items found in feed.")
+
+    def get(item, tag):
+        el = item.find(tag)
+        return el.text if el is not None else ""
+
+    return [{
+        "title": get(item, "title"),
+        "creator": get(item, "{http://purl.org/dc/elements/1.1/}creator"),
+        "description": get(item, "description"),
+        "pubDate": get(item, "pubDate"),
+        "image": get(item, "image"),
+        "link": get(item, "link")
+    } for item in items]
@@ -0,0 +1,93 @@
+"""Watch the feed for tomorrow's devotional without re-downloading it.
+
+Polls are conditional GETs (If-None-Match / If-Modified-Since), so while
+nothing has changed each one costs a single 304.  They are scheduled from
+the current item's pubDate: sleep until about a day after it, then poll
+every ``WINDOW_POLL_S`` until a new item appears.  A slow ``IDLE_POLL_S``
+poll covers clock skew and late publishing, and every delay gets up to
+``JITTER_S`` of random jitter so a fleet of viewers does not poll in step.
+"""
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+from odb import feed, fetch
+from odb.sources import record_key
+
+PUBLISH_EVERY = timedelta(days=1)
+WINDOW_POLL_S = int(os.environ.get("ODB_WINDOW_POLL_S", "300"))
+IDLE_POLL_S = int(os.environ.get("ODB_IDLE_POLL_S", "3600"))
+JITTER_S = int(os.environ.get("ODB_POLL_JITTER_S", "120"))
+
+
+class FeedWatcher:
+    """Conditional polling of one feed for a new first item"""
+
+    def __init__(self, current, feed_url=feed.FEED_URL):
+        self.feed_url = feed_url
+        self.current = current
+        self.etag, self.last_modified = feed.last_validators.get(feed_url, (None, None))
+
+    def expected_at(self):
+        """When the next devotional should appear, from the current pubDate"""
+        try:
+            published = parsedate_to_datetime(self.current["pubDate"])
+        except (TypeError, ValueError):
+            return None
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        return published + PUBLISH_EVERY
+
+    def next_delay(self, now=None):
+        """Seconds until the next poll"""
+        now = now or datetime.now(timezone.utc)
+        expected = self.expected_at()
+        if expected is None or expected <= now:
+            # Due (or overdue): keep checking until it shows up
+            delay = WINDOW_POLL_S
+        else:
+            delay = min((expected - now).total_seconds(), IDLE_POLL_S)
+        return delay + random.uniform(0, JITTER_S)
+
+    def check(self):
+        """The new first item if the feed changed, else None"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        response = fetch.get(self.feed_url, kind="feed", headers=headers)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+        if fetch.is_stale(response):
+            # The origin is down and this is our own last copy; try again later
+            return None
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+
+        item = feed.parse_feed(response.text, 1)[0]
+        # The current record may have come from the API feed, with its own guid
+        if item["guid"] == self.current.get("guid", self.current["link"]) or \
+                record_key(item) == record_key(self.current):
+            return None
+        self.current = item
+        return item
+
+    def watch(self, on_new, stop):
+        """Poll until ``stop`` (a threading.Event) is set; blocking"""
+        while not stop.wait(self.next_delay()):
+            try:
+                item = self.check()
+            except Exception as e:
+                print(f"[WARNING] Feed check failed: {e}")
+                continue
+            if item is not None:
+                print(f"[INFO] New devotional: {item['title']}")
+                on_new(item)
+
+
+def changed_fields(old, new):
+    """Keys whose values differ between two devotional records"""
+    return sorted(key for key in set(old) | set(new) if old.get(key) != new.get(key))
@@ -0,0 +1,236 @@
+import os
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+import requests
+
+from odb import bandwidth, netmetrics, retry
+from odb.cache import cache_path
+from odb.singleflight import SingleFlight
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+TIMEOUT = (10, 30)  # connect, read
+
+# Send every request to a local replay server instead (python3 -m odb replay)
+REPLAY_URL = os.environ.get("ODB_REPLAY")
+
+# Kiosk fleets set this so hundreds of viewers started together spread
+# their first requests over this many seconds
+START_JITTER_S = float(os.environ.get("ODB_START_JITTER_S", "0"))
+
+# Small responses kept on disk so an outage or an open circuit still shows
+# the last good copy
+STALE_OK = {"feed", "page", "playlist"}
+STALE_HEADER = "X-ODB-Stale"
+
+_session = None
+_in_flight = SingleFlight()
+_start_lock = threading.Lock()
+_started = False
+
+# ----------------------------
+# Shared HTTP session
+# ----------------------------
+def get_session():
+    """Return the process-wide requests session (keeps connections alive)"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+        netmetrics.instrument(_session)
+    return _session
+
+def _start_offset():
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+        if START_JITTER_S > 0:
+            delay = random.uniform(0, START_JITTER_S)
+            print(f"[INFO] Waiting {delay:.1f}s before the first request")
+            time.sleep(delay)
+
+def get(url, kind="other", retries=retry.RETRIES, **kwargs):
+    """GET a URL through the shared session.
+
+    ``kind`` (feed, page, playlist, image, audio) labels the request in the
+    network metrics.  Connection errors, 429 and 5xx are retried with
+    jittered backoff (honouring Retry-After); a host that keeps failing has
+    its circuit opened.  For the kinds in STALE_OK the last good copy is
+    returned, marked with an X-ODB-Stale header, when the origin fails.
+
+    Identical concurrent requests (same URL and arguments) share a single
+    download and get the same response object; streamed responses are
+    never shared.
+
+    Requests count as foreground (see odb.bandwidth) until their body has
+    been read, or a streamed response is closed; background requests wait
+    for those to finish first.
+    """
+    if kwargs.get("stream"):
+        return _get(url, kind, retries, **kwargs)
+    response, shared = _in_flight.do(_request_key(url, kwargs), _get, url, kind, retries, **kwargs)
+    if shared:
+        netmetrics.record_coalesced(kind)
+    return response
+
+def _request_key(url, kwargs):
+    return url, repr(sorted((name, sorted(value.items()) if isinstance(value, dict) else value)
+                            for name, value in kwargs.items()))
+
+def _get(url, kind, retries, **kwargs):
+    _start_offset()
+    limiter = bandwidth.get_limiter()
+    if bandwidth.is_background():
+        limiter.wait_idle()
+        return _get_or_stale(url, kind, retries, **kwargs)
+
+    limiter.begin_foreground()
+    try:
+        response = _get_or_stale(url, kind, retries, **kwargs)
+    except BaseException:
+        limiter.end_foreground()
+        raise
+    if kwargs.get("stream"):
+        _end_on_close(response, limiter.end_foreground)
+    else:
+        limiter.end_foreground()
+    return response
+
+def _end_on_close(response, end):
+    close = response.close
+    ended = []
+
+    def close_and_end():
+        try:
+            close()
+        finally:
+            if not ended:
+                ended.append(True)
+                end()
+    response.close = close_and_end
+
+def _get_or_stale(url, kind, retries, **kwargs):
+    kwargs.setdefault("timeout", TIMEOUT)
+    if REPLAY_URL:
+        from odb.replay import replay_url
+        url_to_get = replay_url(REPLAY_URL, url)
+    else:
+        url_to_get = url
+    breaker = retry.breaker_for(urlsplit(url_to_get).netloc)
+
+    try:
+        response = _get_with_retries(url_to_get, kind, retries, breaker, kwargs)
+    except requests.RequestException as e:
+        stale = _stale_copy(url, kind)
+        if stale is None:
+            raise
+        print(f"[WARNING] {e}; using the cached copy of {url}")
+        return stale
+
+    if kind in STALE_OK and not kwargs.get("stream"):
+        if response.status_code == 200:
+            _keep_copy(url, response.content)
+        elif response.status_code in retry.RETRY_STATUSES:
+            stale = _stale_copy(url, kind)
+            if stale is not None:
+                print(f"[WARNING] HTTP {response.status_code}; using the cached copy of {url}")
+                return stale
+    return response
+
+def _get_with_retries(url, kind, retries, breaker, kwargs):
+    for attempt in range(retries + 1):
+        if not breaker.allow():
+            raise retry.CircuitOpen(f"{urlsplit(url).netloc} is failing; not retrying yet")
+        last = attempt == retries
+        try:
+            response = netmetrics.timed_get(get_session(), url, kind, **kwargs)
+        except requests.RequestException:
+            breaker.failure()
+            if last:
+                raise
+            time.sleep(retry.backoff_delay(attempt))
+            continue
+
+        if response.status_code not in retry.RETRY_STATUSES:
+            breaker.success()
+            if not kwargs.get("stream"):
+                bandwidth.get_limiter().pace(len(response.content))
+            return response
+
+        wait = retry.retry_after(response)
+        if wait is not None and wait > retry.MAX_RETRY_AFTER_S:
+            # Too long to hold the caller; fail now and keep others off the host
+            breaker.failure(wait=wait)
+            return response
+        breaker.failure()
+        if last:
+            return response
+        response.close()
+        time.sleep(wait if wait is not None else retry.backoff_delay(attempt))
+    return response
+
+def download(url, kind="other", token=None, chunk_size=64 * 1024, **kwargs):
+    """Body of a GET as bytes, abandoned as soon as ``token`` is cancelled.
+
+    Cancelling closes the connection, so even a stalled read stops at once;
+    odb.scheduler.Cancelled is raised in that case.
+    """
+    from odb.scheduler import Cancelled
+
+    if token is not None:
+        token.check()
+    response = get(url, kind, stream=True, **kwargs)
+    closer = token.on_cancel(response.close) if token is not None else None
+    try:
+        response.raise_for_status()
+        chunks = []
+        for chunk in response.iter_content(chunk_size):
+            if token is not None and token.cancelled:
+                break
+            chunks.append(chunk)
+            bandwidth.get_limiter().pace(len(chunk), token)
+        if token is not None and token.cancelled:
+            raise Cancelled()
+        return b"".join(chunks)
+    except Exception:
+        if token is not None and token.cancelled:
+            raise Cancelled() from None
+        raise
+    finally:
+        if closer is not None:
+            token.remove(closer)
+        response.close()
+
+# ----------------------------
+# Last good copies
+# ----------------------------
+def _keep_copy(url, content):
+    path = cache_path(url, "http")
+    with open(path + ".tmp", "wb") as f:
+        f.write(content)
+    os.replace(path + ".tmp", path)
+
+def _stale_copy(url, kind):
+    """A 200 response rebuilt from the last good copy, or None"""
+    if kind not in STALE_OK:
+        return None
+    try:
+        with open(cache_path(url, "http"), "rb") as f:
+            content = f.read()
+    except OSError:
+        return None
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    response.encoding = "utf-8"
+    response.headers[STALE_HEADER] = "1"
+    netmetrics.record_cache(kind, url, hit=True, size=len(content))
+    return response
+
+def is_stale(response):
+    return STALE_HEADER in response.headers
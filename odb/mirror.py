@@ -0,0 +1,348 @@
+"""LAN mirror: one machine fetches each devotional, every viewer on the site reads it.
+
+    python3 -m odb mirror --days 6                  # on one machine
+    python3 six.py --mirror http://<that machine>:8766
+
+The mirror serves
+
+    /feed.xml           the upstream feed, re-checked at most every FEED_TTL_S
+    /devotionals.json   the feed items with their pages already extracted,
+                        audio metadata, and mirror URLs for image and audio
+    /image/<key>.png    hero images, already scaled to IMAGE_WIDTH
+    /audio/<key>.mp3    the MP3s, with byte ranges
+    /podcast.xml        a podcast feed of every cached MP3 (odb.podcast)
+
+so each artifact crosses the uplink once.  Feed checks are conditional,
+single-flight and run in the background while requests get the current
+documents; each MP3 is filled by a single background download that viewers
+asking for bytes not yet on disk wait on instead of repeating.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from urllib.parse import urljoin, urlsplit
+
+from odb import fetch
+from odb.audio_proxy import AudioProxy, _ProxyHandler, fill, parse_range, send_cached
+from odb.cache import cache_dir, load_record, save_record, url_key
+from odb.display import scale_image
+from odb.extract import page_details
+from odb.feed import FEED_URL
+from odb.podcast import PodcastFeed, archive_records
+from odb.sources import parser_for
+
+PORT = 8766
+MIRROR_DAYS = 6
+FEED_TTL_S = int(os.environ.get("ODB_MIRROR_TTL_S", "300"))
+POLL_S = 0.05
+
+# ----------------------------
+# Server
+# ----------------------------
+class Mirror(AudioProxy):
+    """Caching mirror of the feed, pages, images and audio for a LAN"""
+
+    def __init__(self, host="0.0.0.0", port=PORT, days=MIRROR_DAYS, feed_url=FEED_URL, ttl=FEED_TTL_S,
+                 threaded=True):
+        # threaded=False leaves the serving to an AsyncMirrorServer (odb.aiomirror)
+        super().__init__(host, port, handler=_MirrorHandler, listen=threaded)
+        self.days = days
+        self.feed_url = feed_url
+        self.ttl = ttl
+        self.refresh_lock = threading.Lock()
+        self.prepare_lock = threading.Lock()
+        self.refresher = None  # thread running refresh() for requests
+        self.checked = None
+        self.validators = {}
+        self.feed = None       # (body, etag)
+        self.published = None  # (devotionals.json body, etag)
+        self.fills = {}
+        self.podcast = PodcastFeed()
+        self.waiting = {}  # audio key -> record to publish once its MP3 is cached
+        for record in archive_records():
+            self.publish(record)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def refresh(self):
+        """Re-check the feed if it is due and cache anything new in it.
+
+        Only the feed check holds refresh_lock; the pages, header probes and
+        images of new items are fetched after it, so other requests keep
+        getting the previous documents meanwhile instead of waiting.
+        """
+        with self.refresh_lock:
+            if not self.due():
+                return
+            self.checked = time.monotonic()
+            try:
+                response = fetch.get(self.feed_url, kind="feed", headers=self.validators)
+            except Exception:
+                if self.feed is None:
+                    # Nothing to serve yet, so let the next request try again
+                    self.checked = None
+                raise
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            # Parsed before the validators are kept, so a feed we could not
+            # read is fetched in full again next time
+            items = parser_for(self.feed_url)(response, self.days + 1)
+            if not fetch.is_stale(response):
+                self.validators = {}
+                if response.headers.get("ETag"):
+                    self.validators["If-None-Match"] = response.headers["ETag"]
+                if response.headers.get("Last-Modified"):
+                    self.validators["If-Modified-Since"] = response.headers["Last-Modified"]
+            self.feed = (response.content, _etag(response.content))
+
+        with self.prepare_lock:
+            records = [self.prepare(item) for item in items]
+            body = json.dumps([self.public(record) for record in records], ensure_ascii=False).encode("utf-8")
+            self.published = (body, _etag(body))
+        print(f"[INFO] Mirroring {len(records)} devotionals, newest: {records[0]['title']}")
+
+    def due(self):
+        return self.checked is None or time.monotonic() - self.checked >= self.ttl
+
+    def refresh_in_background(self):
+        """Start refresh() on a thread if it is due; that thread, or None.
+
+        Requests keep getting the current documents meanwhile.
+        """
+        with self.lock:
+            if self.refresher is None or not self.refresher.is_alive():
+                if not self.due():
+                    return None
+                self.refresher = threading.Thread(target=self._refresh, daemon=True,
+                                                  name="odb-mirror-refresh")
+                self.refresher.start()
+            return self.refresher
+
+    def _refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving what we have
+            print(f"[ERROR] Mirror could not refresh the feed: {e}")
+
+    def prepare(self, item):
+        """Extract, probe and cache one devotional (each step only once)"""
+        from odb.mp3probe import audio_metadata
+
+        record = load_record(item["link"])
+        extracted = "mp3_url" in record
+        record.update(item)
+        if not extracted:
+            try:
+                record.update(page_details(item["link"]))
+            except Exception as e:
+                print(f"[WARNING] Could not extract {item['link']}: {e}")
+                record.update(mp3_url=None, bible_link=None, bible_in_one_year=None)
+        save_record(item["link"], record)
+
+        if record.get("mp3_url"):
+            record["audio"] = audio_metadata(record, record["mp3_url"])
+            self.fill_audio(record["mp3_url"])
+        if record.get("image") and not self.scaled_image(record["image"]):
+            record["image"] = None
+        self.publish(record)
+        return record
+
+    def publish(self, record):
+        """Put a devotional in the podcast, now or once its MP3 is cached"""
+        if not record.get("mp3_url"):
+            return
+        key = url_key(record["mp3_url"])
+        image_key = url_key(record["image"]) if record.get("image") else None
+        if image_key and not os.path.exists(self.image_path(image_key)):
+            image_key = None
+        with self.lock:
+            self.sources[key] = record["mp3_url"]
+            self.waiting[key] = (record, image_key)
+        if self.podcast.add(record, image_key):
+            with self.lock:
+                self.waiting.pop(key, None)
+
+    def download(self, origin_url, cached):
+        fill(origin_url, cached)
+        with self.lock:
+            waiting = self.waiting.pop(url_key(origin_url), None) if cached.complete else None
+        if waiting:
+            self.podcast.add(*waiting)
+            print(f"[INFO] New podcast episode: {waiting[0].get('title')}")
+
+    def public(self, record):
+        """A record as the viewers see it: mirror URLs instead of the origin's"""
+        record = dict(record, origin={"image": record.get("image"), "mp3_url": record.get("mp3_url")})
+        if record.get("image"):
+            record["image"] = f"/image/{url_key(record['image'])}.png"
+        if record.get("mp3_url"):
+            record["mp3_url"] = f"/audio/{url_key(record['mp3_url'])}.mp3"
+        return record
+
+    def document(self, path, base):
+        """(content type, ETag, body, file path) for anything but audio, or None.
+
+        Exactly one of body and file path is set; files are sent with sendfile.
+        ``base`` is the mirror's URL as the client sees it.
+        """
+        if path == "/podcast.xml":
+            body, etag = self.podcast.render(base)
+            return "application/rss+xml; charset=utf-8", etag, body, None
+        if path == "/feed.xml" and self.feed:
+            body, etag = self.feed
+            return "application/rss+xml; charset=utf-8", etag, body, None
+        if path == "/devotionals.json" and self.published:
+            body, etag = self.published
+            return "application/json", etag, body, None
+        match = re.match(r"^/image/([0-9a-f]+)\.png$", path)
+        if match and os.path.exists(self.image_path(match.group(1))):
+            # Keyed by the image URL, whose image never changes
+            return "image/png", f'"{match.group(1)}"', None, self.image_path(match.group(1))
+        return None
+
+    def image_path(self, key):
+        return os.path.join(cache_dir("mirror", "images"), key + ".png")
+
+    def scaled_image(self, image_url):
+        """Download and scale an image once; False if that failed"""
+        path = self.image_path(url_key(image_url))
+        if os.path.exists(path):
+            return True
+        try:
+            response = fetch.get(image_url, kind="image")
+            response.raise_for_status()
+            png = scale_image(response.content)
+        except Exception as e:
+            print(f"[ERROR] Could not mirror image {image_url}: {e}")
+            return False
+        with open(path + ".tmp", "wb") as f:
+            f.write(png)
+        os.replace(path + ".tmp", path)
+        return True
+
+    def fill_audio(self, origin_url):
+        """The single background download of an MP3, started if not running"""
+        key = url_key(origin_url)
+        with self.lock:
+            self.sources[key] = origin_url
+        _, cached = self.cache_file(key)
+        with self.lock:
+            thread = self.fills.get(key)
+            if cached.complete or (thread is not None and thread.is_alive()):
+                return thread
+            thread = threading.Thread(target=self.download, args=(origin_url, cached), daemon=True)
+            self.fills[key] = thread
+        thread.start()
+        return thread
+
+    def stream(self, origin_url, cached, start, end, out, sock=None):
+        """Write bytes [start, end) to ``out`` from disk, waiting for the download"""
+        pos = start
+        while pos < end:
+            available = cached.available(pos)
+            if not available:
+                if not self.wait_for(origin_url, cached, pos):
+                    raise OSError(f"download of {origin_url} failed at byte {pos}")
+                continue
+            length = min(available, end - pos)
+            send_cached(cached, pos, length, out, sock)
+            pos += length
+
+    def wait_for(self, origin_url, cached, pos):
+        """Block until byte ``pos`` is on disk; False if the download gave up"""
+        for attempt in range(2):
+            # A failed download is restarted once, by whoever needs it next
+            thread = self.fill_audio(origin_url)
+            while thread is not None and thread.is_alive() and not cached.available(pos):
+                thread.join(POLL_S)
+            if cached.available(pos):
+                return True
+        return False
+
+
+def _etag(body):
+    return '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+
+
+class _MirrorHandler(_ProxyHandler):
+
+    def _serve(self, send_body):
+        mirror = self.server.proxy
+        path = urlsplit(self.path).path
+        if path.startswith("/audio/"):
+            return super()._serve(send_body)
+
+        refresher = mirror.refresh_in_background()
+        if refresher is not None and mirror.published is None:
+            # Nothing to serve yet; the first requests wait for the first refresh
+            refresher.join()
+        found = mirror.document(path, f"http://{self.headers.get('Host') or mirror.url.split('//', 1)[1]}")
+        if found is None:
+            self.send_error(404)
+            return
+        content_type, etag, body, file_path = found
+
+        if etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        size = len(body) if body is not None else os.path.getsize(file_path)
+        status, start, end = parse_range(self.headers.get("Range"), size)
+        self.send_response(status)
+        if status == 416:
+            self.send_header("Content-Range", f"bytes */{size}")
+        elif status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if not send_body or start == end:
+            return
+        try:
+            if body is not None:
+                self.wfile.write(memoryview(body)[start:end])
+            else:
+                with open(file_path, "rb") as f:
+                    self.connection.sendfile(f, start, end - start)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+# ----------------------------
+# Viewer side
+# ----------------------------
+def mirror_feed_url(mirror):
+    return urljoin(mirror, "/feed.xml")
+
+def mirror_records(mirror, count):
+    """The newest ``count`` devotionals from a mirror (today first).
+
+    Image and audio URLs point at the mirror.  Records are also saved to the
+    local cache, so audio_metadata finds the mirror's probe instead of
+    probing again.
+    """
+    response = fetch.get(urljoin(mirror, "/devotionals.json"), kind="feed")
+    response.raise_for_status()
+    records = response.json()[:count]
+    if not records:
+        raise Exception("No items found in feed.")
+    for record in records:
+        for key in ("image", "mp3_url"):
+            if record.get(key):
+                record[key] = urljoin(mirror, record[key])
+        save_record(record["link"], dict(load_record(record["link"]), **record))
+    return records
@@ -0,0 +1,309 @@
+import os
+import struct
+from array import array
+from bisect import bisect_right
+
+from odb.cache import cache_path, partial_file
+
+INDEX_MAGIC = b"ODBI"
+INDEX_VERSION = 1
+
+# ----------------------------
+# MPEG audio frame headers
+# ----------------------------
+_BITRATES = {
+    # (MPEG-1?, layer) -> kbps by bitrate index
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+_header_cache = {}
+
+def parse_frame_header(b1, b2, b3=0):
+    """Decode the bytes after a frame sync.
+
+    Returns ``(frame_length, samples, sample_rate, kbps, side_info_size)``
+    or None when the bytes are not a valid header.  Results are memoised
+    since a file only ever uses a handful of distinct headers.
+    """
+    key = (b1, b2, b3 & 0xC0)
+    if key in _header_cache:
+        return _header_cache[key]
+
+    result = None
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    padding = (b2 >> 1) & 0x01
+    mono = (b3 >> 6) == 3
+    if (b1 & 0xE0) == 0xE0 and version != 1 and layer != 4 \
+            and 0 < bitrate_index < 15 and rate_index != 3:
+        mpeg1 = version == 3
+        kbps = _BITRATES[(mpeg1, layer)][bitrate_index]
+        sample_rate = _SAMPLE_RATES[version][rate_index]
+        if layer == 1:
+            samples = 384
+            length = (12 * kbps * 1000 // sample_rate + padding) * 4
+        elif layer == 3 and not mpeg1:
+            samples = 576
+            length = 72 * kbps * 1000 // sample_rate + padding
+        else:
+            samples = 1152
+            length = 144 * kbps * 1000 // sample_rate + padding
+        if mpeg1:
+            side_info = 17 if mono else 32
+        else:
+            side_info = 9 if mono else 17
+        result = (length, samples, sample_rate, kbps, side_info)
+
+    _header_cache[key] = result
+    return result
+
+def id3_size(data):
+    """Size of a leading ID3v2 tag (0 if there is none)"""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = 0
+        for b in data[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+def find_first_frame(data, start=0):
+    """Offset of the first frame that is followed by another valid frame"""
+    pos = data.find(b"\xff", start)
+    while 0 <= pos < len(data) - 4:
+        header = parse_frame_header(data[pos + 1], data[pos + 2], data[pos + 3])
+        if header:
+            nxt = pos + header[0]
+            if nxt + 4 > len(data) or (
+                    data[nxt] == 0xFF and parse_frame_header(data[nxt + 1], data[nxt + 2], data[nxt + 3])):
+                return pos
+        pos = data.find(b"\xff", pos + 1)
+    return -1
+
+def parse_vbr_header(data, frame_offset):
+    """Read a Xing/Info or VBRI header from the first frame.
+
+    Returns a dict with ``frames``, ``bytes`` and ``toc`` (a list of 100
+    byte-position percentages, possibly empty), or None.
+    """
+    header = parse_frame_header(data[frame_offset + 1], data[frame_offset + 2], data[frame_offset + 3])
+    if not header:
+        return None
+    pos = frame_offset + 4 + header[4]
+    tag = data[pos:pos + 4]
+    if tag in (b"Xing", b"Info") and len(data) >= pos + 8:
+        flags = struct.unpack(">I", data[pos + 4:pos + 8])[0]
+        info = {"frames": None, "bytes": None, "toc": []}
+        pos += 8
+        if flags & 0x1:
+            info["frames"] = struct.unpack(">I", data[pos:pos + 4])[0]
+            pos += 4
+        if flags & 0x2:
+            info["bytes"] = struct.unpack(">I", data[pos:pos + 4])[0]
+            pos += 4
+        if flags & 0x4 and len(data) >= pos + 100:
+            info["toc"] = list(data[pos:pos + 100])
+        return info
+
+    pos = frame_offset + 4 + 32
+    if data[pos:pos + 4] == b"VBRI" and len(data) >= pos + 26:
+        _, _, _, total_bytes, frames, entries, scale, entry_size, _ = struct.unpack(
+            ">HHHIIHHHH", data[pos + 4:pos + 26]
+        )
+        # VBRI stores byte deltas per TOC entry; convert to percentages
+        toc, offset, pos = [], 0, pos + 26
+        fmt = {1: ">B", 2: ">H", 4: ">I"}.get(entry_size)
+        if fmt and total_bytes and len(data) >= pos + entries * entry_size:
+            points = []
+            for i in range(entries):
+                offset += struct.unpack(fmt, data[pos:pos + entry_size])[0] * scale
+                points.append(offset)
+                pos += entry_size
+            toc = [0] + [min(255, points[min(i * entries // 100, entries - 1)] * 256 // total_bytes)
+                         for i in range(1, 100)]
+        return {"frames": frames, "bytes": total_bytes, "toc": toc}
+    return None
+
+# ----------------------------
+# Seek index
+# ----------------------------
+class SeekIndex:
+    """Byte offset of the frame playing at each whole second of audio"""
+
+    def __init__(self, offsets, duration_ms, size):
+        self.offsets = offsets
+        self.duration_ms = duration_ms
+        self.size = size
+
+    def offset_at(self, ms):
+        """Byte offset to start reading from to play at ``ms``"""
+        if not self.offsets:
+            return 0
+        second = min(max(int(ms // 1000), 0), len(self.offsets) - 1)
+        return self.offsets[second]
+
+    def time_at(self, offset):
+        """Playback time (ms) of the frame containing byte ``offset``"""
+        second = bisect_right(self.offsets, offset) - 1
+        return max(second, 0) * 1000
+
+    def to_player(self, ms, player_duration):
+        """Convert a true position to the player's own time scale.
+
+        Backends that only estimated the duration of a VBR file seek by
+        assuming a constant bitrate, so we aim them at the right byte.
+        """
+        if not player_duration or abs(player_duration - self.duration_ms) <= self.duration_ms / 100:
+            return int(ms)
+        return int(self.offset_at(ms) / self.size * player_duration)
+
+    def from_player(self, position, player_duration):
+        """Inverse of ``to_player``"""
+        if not player_duration or abs(player_duration - self.duration_ms) <= self.duration_ms / 100:
+            return int(position)
+        return self.time_at(int(position / player_duration * self.size))
+
+    def save(self, path):
+        with open(path + ".tmp", "wb") as f:
+            f.write(struct.pack("<4sHIII", INDEX_MAGIC, INDEX_VERSION,
+                                self.duration_ms, self.size, len(self.offsets)))
+            self.offsets.tofile(f)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            header = f.read(18)
+            magic, version, duration_ms, size, count = struct.unpack("<4sHIII", header)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                return None
+            offsets = array("I")
+            offsets.fromfile(f, count)
+        return cls(offsets, duration_ms, size)
+
+
+def scan_frames(data):
+    """Walk every frame header in ``data`` and build a SeekIndex"""
+    offsets = array("I")
+    pos = find_first_frame(data, id3_size(data))
+    if pos < 0:
+        return SeekIndex(offsets, 0, len(data))
+
+    # A Xing/Info frame carries no audio; skip it
+    first = parse_frame_header(data[pos + 1], data[pos + 2], data[pos + 3])
+    if parse_vbr_header(data, pos):
+        pos += first[0]
+
+    end = len(data) - 4
+    samples_total = 0
+    sample_rate = first[2]
+    next_second = 0
+    headers = _header_cache
+    while pos <= end:
+        if data[pos] != 0xFF:
+            # Lost sync (junk or trailing tag); resynchronise
+            pos = find_first_frame(data, pos + 1)
+            if pos < 0:
+                break
+            continue
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        header = headers.get((b1, b2, b3 & 0xC0)) or parse_frame_header(b1, b2, b3)
+        if header is None:
+            pos = find_first_frame(data, pos + 1)
+            if pos < 0:
+                break
+            continue
+        if samples_total >= next_second * sample_rate:
+            offsets.append(pos)
+            next_second += 1
+        samples_total += header[1]
+        pos += header[0]
+
+    duration_ms = samples_total * 1000 // sample_rate
+    return SeekIndex(offsets, duration_ms, len(data))
+
+
+def index_from_toc(data, size):
+    """Approximate SeekIndex from a Xing/VBRI table of contents.
+
+    Only needs the first few KB of the file, so it works before the
+    download has finished.
+    """
+    pos = find_first_frame(data, id3_size(data))
+    if pos < 0:
+        return None
+    header = parse_frame_header(data[pos + 1], data[pos + 2], data[pos + 3])
+    info = parse_vbr_header(data, pos)
+    if not info or not info["frames"]:
+        return None
+    duration_ms = info["frames"] * header[1] * 1000 // header[2]
+    audio_bytes = info["bytes"] or (size - pos)
+    seconds = max(duration_ms // 1000, 1)
+    offsets = array("I")
+    toc = info["toc"]
+    for second in range(seconds):
+        percent = second * 100.0 / (duration_ms / 1000.0)
+        if toc:
+            i = min(int(percent), 99)
+            lo = toc[i]
+            hi = toc[i + 1] if i < 99 else 256
+            fraction = (lo + (hi - lo) * (percent - i)) / 256.0
+        else:
+            fraction = percent / 100.0
+        offsets.append(min(pos + int(fraction * audio_bytes), size))
+    return SeekIndex(offsets, duration_ms, size)
+
+
+def index_path(audio_path):
+    return audio_path + ".idx"
+
+def build_index(audio_path):
+    """Scan a complete cached file and store its index next to it"""
+    with open(audio_path, "rb") as f:
+        data = f.read()
+    index = scan_frames(data)
+    index.save(index_path(audio_path))
+    return index
+
+def seek_index_for(mp3_url):
+    """Best available seek index for a cached MP3, or None.
+
+    A complete cached file gets an exact frame scan (stored once as
+    ``<file>.idx``); a partially cached one falls back to its Xing/VBRI TOC.
+    """
+    if not mp3_url:
+        return None
+    audio_path = cache_path(mp3_url)
+    idx_path = index_path(audio_path)
+    try:
+        if os.path.exists(audio_path):
+            if os.path.exists(idx_path) and os.path.getmtime(idx_path) >= os.path.getmtime(audio_path):
+                try:
+                    index = SeekIndex.load(idx_path)
+                except (EOFError, ValueError, OSError, struct.error) as e:
+                    # Truncated or corrupt; scan the audio again
+                    print(f"[WARNING] Discarding bad seek index {idx_path}: {e}")
+                    os.remove(idx_path)
+                    index = None
+                if index:
+                    return index
+            return build_index(audio_path)
+
+        cached = partial_file(audio_path)
+        head = cached.available(0)
+        if cached.size and head >= 4096:
+            return index_from_toc(cached.read(0, min(head, 64 * 1024)), cached.size)
+    except (OSError, struct.error) as e:
+        print(f"[WARNING] Could not build seek index: {e}")
+    return None
@@ -0,0 +1,152 @@
+import re
+
+from odb import bandwidth, fetch, netmetrics
+from odb.cache import cache_path, load_record, partial_file, save_record
+from odb.mp3index import find_first_frame, id3_size, parse_frame_header, parse_vbr_header, seek_index_for
+
+PROBE_BYTES = 16 * 1024
+
+# ----------------------------
+# ID3 tags
+# ----------------------------
+def _decode_text_frame(body):
+    encoding = body[:1]
+    text = body[1:]
+    if encoding == b"\x01":
+        value = text.decode("utf-16", "replace")
+    elif encoding == b"\x02":
+        value = text.decode("utf-16-be", "replace")
+    elif encoding == b"\x03":
+        value = text.decode("utf-8", "replace")
+    else:
+        value = text.decode("latin-1", "replace")
+    return value.strip("\x00").strip()
+
+def parse_id3_frames(data):
+    """Return the text frames (TIT2, TLEN, ...) of a leading ID3v2 tag"""
+    frames = {}
+    if data[:3] != b"ID3" or len(data) < 10:
+        return frames
+    major = data[3]
+    end = min(id3_size(data), len(data))
+    pos = 10
+    while pos + 10 <= end:
+        frame_id = data[pos:pos + 4]
+        if not re.match(rb"^[A-Z0-9]{4}$", frame_id):
+            break
+        raw = data[pos + 4:pos + 8]
+        if major >= 4:
+            size = 0
+            for b in raw:
+                size = (size << 7) | (b & 0x7F)
+        else:
+            size = int.from_bytes(raw, "big")
+        body = data[pos + 10:pos + 10 + size]
+        if frame_id.startswith(b"T"):
+            frames[frame_id.decode("ascii")] = _decode_text_frame(body)
+        pos += 10 + size
+    return frames
+
+# ----------------------------
+# Header probe
+# ----------------------------
+def parse_mp3_head(data, total_size):
+    """Duration, bitrate and title from the first bytes of an MP3"""
+    tags = parse_id3_frames(data)
+    meta = {"title": tags.get("TIT2"), "size": total_size,
+            "duration_ms": None, "bitrate_kbps": None}
+
+    frame = find_first_frame(data, id3_size(data))
+    if frame >= 0:
+        length, samples, sample_rate, kbps, _ = parse_frame_header(
+            data[frame + 1], data[frame + 2], data[frame + 3]
+        )
+        vbr = parse_vbr_header(data, frame)
+        if vbr and vbr["frames"]:
+            meta["duration_ms"] = vbr["frames"] * samples * 1000 // sample_rate
+            audio_bytes = vbr["bytes"] or (total_size - frame if total_size else None)
+            if audio_bytes and meta["duration_ms"]:
+                meta["bitrate_kbps"] = round(audio_bytes * 8 / meta["duration_ms"])
+        else:
+            meta["bitrate_kbps"] = kbps
+            if total_size:
+                meta["duration_ms"] = (total_size - frame) * 8 // kbps
+
+    if meta["duration_ms"] is None and tags.get("TLEN", "").isdigit():
+        meta["duration_ms"] = int(tags["TLEN"])
+    return meta
+
+def _fetch_range(url, start, end):
+    response = fetch.get(url, kind="audio", headers={"Range": f"bytes={start}-{end - 1}"}, stream=True)
+    try:
+        response.raise_for_status()
+        total = None
+        content_range = response.headers.get("Content-Range", "")
+        if content_range.rsplit("/", 1)[-1].isdigit():
+            total = int(content_range.rsplit("/", 1)[1])
+        elif response.status_code == 200 and response.headers.get("Content-Length"):
+            total = int(response.headers["Content-Length"])
+        data = b""
+        for chunk in response.iter_content(8192):
+            data += chunk
+            bandwidth.get_limiter().pace(len(chunk))
+            if len(data) >= end - start:
+                break
+        return data[:end - start], total, response.status_code == 206
+    finally:
+        response.close()
+
+def probe_mp3(url):
+    """Read just the head of a remote MP3 with a Range request.
+
+    Fetches the ID3 tag and the first frame (with its Xing/VBRI header);
+    the bytes are kept in the audio cache so playback starts from them.
+    Already cached heads are parsed locally.
+    """
+    cached = partial_file(cache_path(url))
+    if cached.size and cached.available(0) >= min(PROBE_BYTES, cached.size):
+        data = cached.read(0, PROBE_BYTES)
+        tag_size = id3_size(data)
+        if cached.available(0) >= tag_size + 4096:
+            return parse_mp3_head(cached.read(0, tag_size + 4096 + PROBE_BYTES), cached.size)
+
+    data, total, ranged = _fetch_range(url, 0, PROBE_BYTES)
+    tag_size = id3_size(data)
+    if ranged and tag_size + 4096 > len(data):
+        # Large embedded artwork: read on past the end of the tag
+        more, _, _ = _fetch_range(url, len(data), tag_size + 4096)
+        data += more
+
+    if ranged and total:
+        cached.set_size(total)
+        cached.write(0, data)
+
+    return parse_mp3_head(data, total)
+
+def audio_metadata(devotional, mp3_url):
+    """Audio metadata for a devotional, probed once and kept in its record"""
+    record = load_record(devotional["link"])
+    meta = record.get("audio")
+    if meta and record.get("mp3_url") == mp3_url:
+        netmetrics.record_cache("audio-metadata", mp3_url, hit=True)
+        return meta
+
+    try:
+        meta = probe_mp3(mp3_url)
+    except Exception as e:
+        print(f"[WARNING] Could not probe MP3 header: {e}")
+        return {}
+    record.update(devotional)
+    record["mp3_url"] = mp3_url
+    record["audio"] = meta
+    save_record(devotional["link"], record)
+    print(f"[INFO] Audio: {meta['title']} ({meta['duration_ms']} ms, {meta['bitrate_kbps']} kbps)")
+    return meta
+
+def track_info(devotional, mp3_url):
+    """(metadata, seek index) for a track; slow, so viewers run it off the GUI thread.
+
+    The probe goes first so a partly downloaded file has its Xing/VBRI TOC
+    on disk for the index.
+    """
+    return audio_metadata(devotional, mp3_url), seek_index_for(mp3_url)
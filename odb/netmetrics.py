@@ -0,0 +1,302 @@
+"""Per-request HTTP timings, bytes on the wire and cache accounting.
+
+Every request made through ``odb.fetch`` is recorded with a DNS / connect /
+TLS / wait (time to first byte) / receive breakdown, its status, the bytes
+read off the wire and the decoded body size.  Local cache hits are counted
+alongside, as is what the foreground and background bandwidth budgets
+(odb.bandwidth) let through and how long they held transfers back.  The
+run's snapshot is saved to the cache at exit and can be printed or exported
+as HAR with ``python3 -m odb metrics``.
+"""
+import os
+import json
+import time
+import socket
+import atexit
+import threading
+from collections import deque
+from datetime import datetime, timezone
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from odb import bandwidth
+from odb.cache import cache_dir
+
+# Long-running viewers keep only the most recent requests in detail
+MAX_ENTRIES = 1000
+
+_lock = threading.Lock()
+_local = threading.local()
+_entries = deque(maxlen=MAX_ENTRIES)
+_by_kind = {}
+_cache = {"hits": 0, "misses": 0, "bytes_from_cache": 0}
+# Requests (by kind) answered by another caller's in-flight download or parse
+_coalesced = {}
+# Full downloads seen so far, to count repeats of the same one
+_downloaded = {}
+_duplicates = 0
+_started = time.time()
+
+# ----------------------------
+# Connection timing
+# ----------------------------
+def _note_connect(**timings):
+    if getattr(_local, "connect", None) is None:
+        _local.connect = {}
+    _local.connect.update(timings)
+
+
+class _TimedConnectionMixin:
+    """Times DNS and TCP connect separately for new connections"""
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            return super()._new_conn()  # raises urllib3's own resolution error
+        resolved = time.perf_counter()
+
+        host = self._dns_host
+        error = None
+        for info in infos:
+            # Connect to the address we resolved instead of resolving again
+            self._dns_host = info[4][0]
+            try:
+                sock = super()._new_conn()
+                break
+            except Exception as e:
+                error = e
+            finally:
+                self._dns_host = host
+        else:
+            raise error
+        _note_connect(dns=resolved - start, connect=time.perf_counter() - resolved)
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        total = time.perf_counter() - start
+        timings = getattr(_local, "connect", None) or {}
+        _note_connect(ssl=max(total - timings.get("dns", 0) - timings.get("connect", 0), 0))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def instrument(session):
+    """Mount the timing adapter on a requests session"""
+    adapter = TimedAdapter()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+# ----------------------------
+# Request records
+# ----------------------------
+def timed_get(session, url, kind, **kwargs):
+    """``session.get`` that records timings and sizes for the request"""
+    _local.connect = None
+    started = time.time()
+    start = time.perf_counter()
+    try:
+        response = session.get(url, **kwargs)
+    except Exception as e:
+        _add_entry({"url": url, "kind": kind, "method": "GET", "status": 0,
+                    "started": started, "error": repr(e),
+                    "total_ms": (time.perf_counter() - start) * 1000})
+        raise
+    connect = _local.connect or {}
+    _local.connect = None
+
+    def finish():
+        total = time.perf_counter() - start
+        headers_at = response.elapsed.total_seconds()
+        setup = sum(connect.values())
+        wire = response.raw.tell() if response.raw is not None else 0
+        content = response.__dict__.get("_content")
+        decoded = len(content) if isinstance(content, bytes) else wire
+        _add_entry({
+            "url": url, "kind": kind, "method": "GET",
+            "status": response.status_code, "started": started,
+            "request_headers": dict(response.request.headers),
+            "response_headers": dict(response.headers),
+            "timings": {
+                "dns": connect["dns"] * 1000 if "dns" in connect else -1,
+                "connect": connect["connect"] * 1000 if "connect" in connect else -1,
+                "ssl": connect["ssl"] * 1000 if "ssl" in connect else -1,
+                "wait": max(headers_at - setup, 0) * 1000,
+                "receive": max(total - headers_at, 0) * 1000,
+            },
+            "total_ms": total * 1000,
+            "wire_bytes": wire,
+            "decoded_bytes": decoded,
+            "cache": "revalidated" if response.status_code == 304 else "miss",
+        })
+
+    if kwargs.get("stream"):
+        # The body is read later; record when the caller closes the response
+        close = response.close
+
+        def close_and_record():
+            if not getattr(response, "_odb_recorded", False):
+                response._odb_recorded = True
+                finish()
+            close()
+        response.close = close_and_record
+    else:
+        finish()
+    return response
+
+def _add_entry(entry):
+    global _duplicates
+    with _lock:
+        _entries.append(entry)
+        if entry.get("status") in (200, 206) and not _conditional(entry):
+            key = (entry["url"], entry.get("request_headers", {}).get("Range"))
+            if key in _downloaded:
+                _duplicates += 1
+            elif len(_downloaded) < MAX_ENTRIES:
+                _downloaded[key] = True
+        stats = _by_kind.setdefault(entry["kind"], {
+            "requests": 0, "errors": 0, "wire_bytes": 0, "decoded_bytes": 0, "total_ms": 0.0
+        })
+        stats["requests"] += 1
+        stats["errors"] += 1 if not entry.get("status") or entry["status"] >= 400 else 0
+        stats["wire_bytes"] += entry.get("wire_bytes", 0)
+        stats["decoded_bytes"] += entry.get("decoded_bytes", 0)
+        stats["total_ms"] += entry.get("total_ms", 0)
+        if entry.get("cache") == "revalidated":
+            _cache["hits"] += 1
+        elif entry.get("status"):
+            _cache["misses"] += 1
+
+def _conditional(entry):
+    headers = entry.get("request_headers", {})
+    return "If-None-Match" in headers or "If-Modified-Since" in headers
+
+def record_coalesced(kind):
+    """Count a request that shared another caller's in-flight work"""
+    with _lock:
+        _coalesced[kind] = _coalesced.get(kind, 0) + 1
+
+def record_cache(kind, url, hit, size=0):
+    """Count a lookup in one of our local caches"""
+    with _lock:
+        if hit:
+            _cache["hits"] += 1
+            _cache["bytes_from_cache"] += size
+        else:
+            _cache["misses"] += 1
+
+# ----------------------------
+# Snapshots
+# ----------------------------
+def snapshot():
+    """Aggregate view of everything recorded in this process"""
+    with _lock:
+        entries = list(_entries)
+        cache = dict(_cache)
+        by_kind = {kind: dict(stats) for kind, stats in _by_kind.items()}
+        coalesced = dict(_coalesced)
+        duplicates = _duplicates
+    return {
+        "started": _started,
+        "requests": sum(stats["requests"] for stats in by_kind.values()),
+        "wire_bytes": sum(stats["wire_bytes"] for stats in by_kind.values()),
+        "decoded_bytes": sum(stats["decoded_bytes"] for stats in by_kind.values()),
+        "by_kind": by_kind,
+        "cache": cache,
+        "coalesced": coalesced,
+        "duplicates": duplicates,
+        "bandwidth": bandwidth.get_limiter().snapshot(),
+        "entries": entries,
+    }
+
+def last_path():
+    return os.path.join(cache_dir("metrics"), "last.json")
+
+def save():
+    """Keep this run's snapshot for ``python3 -m odb metrics``"""
+    snap = snapshot()
+    if not snap["requests"]:
+        return
+    with open(last_path() + ".tmp", "w") as f:
+        json.dump(snap, f)
+    os.replace(last_path() + ".tmp", last_path())
+
+def load_last():
+    try:
+        with open(last_path()) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+atexit.register(save)
+
+# ----------------------------
+# HAR export
+# ----------------------------
+def to_har(snap):
+    """Convert a snapshot to a HAR 1.2 document"""
+    entries = []
+    for entry in snap["entries"]:
+        timings = entry.get("timings", {})
+        started = datetime.fromtimestamp(entry["started"], timezone.utc)
+        response_headers = entry.get("response_headers", {})
+        wire = entry.get("wire_bytes", 0)
+        decoded = entry.get("decoded_bytes", 0)
+        entries.append({
+            "startedDateTime": started.isoformat().replace("+00:00", "Z"),
+            "time": entry.get("total_ms", 0),
+            "request": {
+                "method": entry["method"], "url": entry["url"], "httpVersion": "HTTP/1.1",
+                "headers": [{"name": k, "value": v} for k, v in entry.get("request_headers", {}).items()],
+                "queryString": [], "cookies": [], "headersSize": -1, "bodySize": 0,
+            },
+            "response": {
+                "status": entry.get("status", 0), "statusText": "", "httpVersion": "HTTP/1.1",
+                "headers": [{"name": k, "value": v} for k, v in response_headers.items()],
+                "cookies": [], "redirectURL": "", "headersSize": -1, "bodySize": wire,
+                "content": {"size": decoded, "compression": decoded - wire,
+                            "mimeType": response_headers.get("Content-Type", "")},
+            },
+            "cache": {},
+            "timings": {
+                "blocked": -1,
+                "dns": timings.get("dns", -1),
+                # HAR's connect includes the TLS handshake
+                "connect": (timings.get("connect", -1) + max(timings.get("ssl", 0), 0)
+                            if timings.get("connect", -1) >= 0 else -1),
+                "ssl": timings.get("ssl", -1),
+                "send": 0,
+                "wait": timings.get("wait", 0),
+                "receive": timings.get("receive", 0),
+            },
+            "comment": f"{entry['kind']}, cache {entry.get('cache', 'miss')}"
+                       + (f", error {entry['error']}" if entry.get("error") else ""),
+        })
+    return {"log": {"version": "1.2", "creator": {"name": "odb", "version": "1"},
+                    "pages": [], "entries": entries}}
@@ -0,0 +1,106 @@
+import os
+import json
+
+from odb.cache import CACHE_DIR, cache_dir
+
+QUEUE_FILE = "queue.json"
+
+# ----------------------------
+# Multi-day playback queue
+# ----------------------------
+class PlayQueue:
+    """Devotionals to play back to back.
+
+    Entries are dicts with at least ``title``, ``link`` and ``mp3_url``.
+    The queue is saved to the cache on every change so playback resumes
+    where it left off after a restart.
+    """
+
+    def __init__(self, entries, index=0, links=None):
+        self.entries = entries
+        self.index = index
+        # Feed links the queue was built from (including skipped ones)
+        self.links = links or [entry["link"] for entry in entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def current(self):
+        return self.entries[self.index] if self.entries else None
+
+    @property
+    def next_entry(self):
+        if self.index + 1 < len(self.entries):
+            return self.entries[self.index + 1]
+        return None
+
+    def select(self, index):
+        self.index = index
+        self.save()
+        return self.current
+
+    def advance(self):
+        """Move to the next entry; returns it, or None at the end"""
+        if self.next_entry is None:
+            self.discard()
+            return None
+        return self.select(self.index + 1)
+
+    def prefetch_next(self, token=None):
+        """Start filling the audio cache for the upcoming track (a Future, or None)"""
+        from odb.audio_proxy import get_proxy
+
+        if self.next_entry:
+            return get_proxy().prefetch(self.next_entry["mp3_url"], token=token)
+        return None
+
+    def save(self):
+        path = os.path.join(cache_dir(), QUEUE_FILE)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"index": self.index, "entries": self.entries, "links": self.links},
+                      f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def discard(self):
+        """Forget the saved state once the queue has been played through"""
+        path = os.path.join(CACHE_DIR, QUEUE_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+
+    @classmethod
+    def load(cls):
+        try:
+            with open(os.path.join(CACHE_DIR, QUEUE_FILE), encoding="utf-8") as f:
+                state = json.load(f)
+            return cls(state["entries"], state["index"], state.get("links"))
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def queue_for(items, resolve_mp3, selection=None):
+    """Queue for the given feed items (today first, then earlier days).
+
+    ``selection`` optionally picks item positions to play instead of all of
+    them.  A saved queue over the same items is resumed rather than rebuilt.
+    """
+    if selection:
+        items = [items[i] for i in selection if 0 <= i < len(items)]
+
+    saved = PlayQueue.load()
+    links = [item["link"] for item in items]
+    if saved and saved.entries and saved.links == links:
+        print(f"[INFO] Resuming queue at track {saved.index + 1} of {len(saved)}")
+        return saved
+
+    entries = []
+    for item in items:
+        mp3_url = resolve_mp3(item["link"])
+        if mp3_url:
+            entries.append({"title": item["title"], "link": item["link"],
+                            "pubDate": item.get("pubDate", ""), "mp3_url": mp3_url})
+        else:
+            print(f"[WARNING] No MP3 for {item['title']}, skipping")
+    queue = PlayQueue(entries, links=links)
+    queue.save()
+    return queue
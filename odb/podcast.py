@@ -0,0 +1,132 @@
+"""Podcast RSS for podcast apps, built from the local archive.
+
+Every devotional whose MP3 is fully cached becomes an <item> with an
+<enclosure> on the LAN mirror (``/audio/<key>.mp3``), its length and
+duration taken from the cached audio metadata.  Items are rendered once,
+as they arrive; serving the feed only joins the rendered items, so podcast
+apps can poll it as often as they like.
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from xml.sax.saxutils import escape, quoteattr
+
+from odb.cache import cache_dir, cache_path, url_key
+from odb.display import format_time
+
+TITLE = "Our Daily Bread (local)"
+SITE_URL = "https://ourdailybreadministries.ca/"
+MAX_ITEMS = 90
+# Rendered documents kept, one per address clients reach the mirror by;
+# the Host header is the client's to choose, so this is an LRU
+MAX_DOCUMENTS = 8
+# Stands in for the mirror's address in rendered items; it depends on how
+# each client reached the mirror
+BASE = "\x00base\x00"
+
+
+def archive_records():
+    """Every devotional record in the cache, as saved by the feed side"""
+    folder = cache_dir("records")
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(folder, name), encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            continue
+        # Records copied from a mirror point at the mirror, not the origin
+        if "origin" not in record:
+            yield record
+
+
+def _published(record):
+    try:
+        return parsedate_to_datetime(record["pubDate"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0
+
+
+def render_item(record, image_key=None):
+    """The <item> for a record, with BASE where the mirror's URL goes"""
+    audio = record["audio"]
+    enclosure_url = f"{BASE}/audio/{url_key(record['mp3_url'])}.mp3"
+    lines = [
+        "<item>",
+        f"<title>{escape(record.get('title', ''))}</title>",
+        f"<link>{escape(record['link'])}</link>",
+        f"<guid isPermaLink=\"false\">{escape(record.get('guid') or record['link'])}</guid>",
+        f"<pubDate>{escape(record.get('pubDate', ''))}</pubDate>",
+        f"<description>{escape(record.get('description', ''))}</description>",
+        f"<itunes:author>{escape(record.get('creator', ''))}</itunes:author>",
+        f"<enclosure url={quoteattr(enclosure_url)} length=\"{audio['size']}\" type=\"audio/mpeg\"/>",
+    ]
+    if audio.get("duration_ms"):
+        lines.append(f"<itunes:duration>{format_time(audio['duration_ms'])}</itunes:duration>")
+    if image_key:
+        lines.append(f"<itunes:image href={quoteattr(BASE + f'/image/{image_key}.png')}/>")
+    lines.append("</item>")
+    return "\n".join(lines)
+
+
+class PodcastFeed:
+    """Rendered items by link, and the last document built for each base URL"""
+
+    def __init__(self, max_items=MAX_ITEMS):
+        self.max_items = max_items
+        self.lock = threading.Lock()
+        self.items = {}  # link -> (published timestamp, rendered item)
+        self.version = 0
+        self.documents = OrderedDict()  # base -> (version, body, etag), most recent last
+
+    def ready(self, record):
+        """True if a record can be an episode: its MP3 is cached and measured"""
+        return bool(record.get("mp3_url") and record.get("audio", {}).get("size")
+                    and os.path.exists(cache_path(record["mp3_url"])))
+
+    def add(self, record, image_key=None):
+        """Add or update an episode; returns False if it is not ready yet"""
+        if not self.ready(record):
+            return False
+        item = (_published(record), render_item(record, image_key))
+        with self.lock:
+            if self.items.get(record["link"]) != item:
+                self.items[record["link"]] = item
+                self.version += 1
+        return True
+
+    def render(self, base):
+        """(body, ETag) of the feed with enclosures under ``base``"""
+        with self.lock:
+            cached = self.documents.get(base)
+            if cached and cached[0] == self.version:
+                self.documents.move_to_end(base)
+                return cached[1], cached[2]
+            version = self.version
+            items = sorted(self.items.values(), reverse=True)[:self.max_items]
+
+        newest = items[0][0] if items else 0
+        body = "\n".join([
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<rss version="2.0" xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd">',
+            "<channel>",
+            f"<title>{escape(TITLE)}</title>",
+            f"<link>{SITE_URL}</link>",
+            "<description>Daily devotionals from Our Daily Bread, served from this network</description>",
+            "<language>en</language>",
+            f"<lastBuildDate>{formatdate(newest, usegmt=True)}</lastBuildDate>",
+            *(rendered for _, rendered in items),
+            "</channel>",
+            "</rss>",
+        ]).replace(BASE, escape(base, {'"': "&quot;"})).encode("utf-8")
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        with self.lock:
+            self.documents[base] = (version, body, etag)
+            self.documents.move_to_end(base)
+            while len(self.documents) > MAX_DOCUMENTS:
+                self.documents.popitem(last=False)
+        return body, etag
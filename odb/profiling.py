@@ -0,0 +1,166 @@
+"""``--profile`` support: cProfile, stack sampling and tracemalloc.
+
+A profiled run covers startup and the first ``seconds`` of the app, then
+writes to a timestamped directory under ``<cache>/profiles``:
+
+    profile.pstats    cProfile data (snakeviz, ``python3 -m pstats``)
+    profile.txt       the same, top functions by cumulative time
+    stacks.folded     sampled stacks for flamegraph.pl / speedscope
+    allocations.txt   largest live allocations and peak traced memory
+
+Before Python 3.12 cProfile can only be disabled from the thread that
+enabled it, so there the deadline just marks the profiler ``due``; the
+Qt viewers call ``poll`` from a timer and other entry points write the
+reports at exit.
+"""
+import os
+import sys
+import time
+import atexit
+import threading
+from collections import Counter
+
+from odb.cache import cache_dir
+
+DEFAULT_SECONDS = 15
+SAMPLE_INTERVAL = 0.005
+TRACE_FRAMES = 25
+
+
+class Profiler:
+    """Profiles the process from ``start`` until ``stop`` or the deadline"""
+
+    def __init__(self, seconds=DEFAULT_SECONDS, out_dir=None):
+        self.seconds = seconds
+        self.out_dir = out_dir
+        self.profile = None
+        self.stacks = Counter()
+        self._done = threading.Event()
+        self._written = threading.Event()
+        self._lock = threading.Lock()
+        self._stopped = False
+        self.owner = None
+        self.due = threading.Event()
+
+    def start(self):
+        # Imported here: pstats alone would add ~35 ms to every launch
+        import cProfile
+        import tracemalloc
+
+        tracemalloc.start(TRACE_FRAMES)
+        self.owner = threading.get_ident()
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        threading.Thread(target=self._sample, name="odb-profiler", daemon=True).start()
+        # A run that ends (or crashes) early still gets its reports
+        atexit.register(self.stop)
+        print(f"[INFO] Profiling the first {self.seconds:g}s")
+        return self
+
+    def _sample(self):
+        """Record every thread's stack until stopped; stop at the deadline"""
+        me = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while not self._done.wait(SAMPLE_INTERVAL):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    self.stacks[_fold(names.get(ident, str(ident)), frame)] += 1
+            if time.monotonic() >= deadline:
+                if sys.version_info >= (3, 12):
+                    self.stop()
+                else:
+                    # Left to the owning thread (poll, or at exit)
+                    self.due.set()
+                return
+
+    def poll(self):
+        """Stop if the deadline has passed; call from the thread that started profiling"""
+        if self.due.is_set():
+            self.stop()
+
+    def stop(self):
+        import pstats
+        import tracemalloc
+
+        with self._lock:
+            stopped, self._stopped = self._stopped, True
+        if stopped:
+            # At exit, let a write started by the deadline finish
+            self._written.wait()
+            return
+        self._done.set()
+        try:
+            self.profile.disable()
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            out_dir = self.out_dir or cache_dir("profiles", time.strftime("%Y%m%d-%H%M%S"))
+            os.makedirs(out_dir, exist_ok=True)
+            self.profile.dump_stats(os.path.join(out_dir, "profile.pstats"))
+            with open(os.path.join(out_dir, "profile.txt"), "w") as f:
+                stats = pstats.Stats(self.profile, stream=f)
+                stats.sort_stats("cumulative").print_stats(60)
+            with open(os.path.join(out_dir, "stacks.folded"), "w") as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(os.path.join(out_dir, "allocations.txt"), "w") as f:
+                write_allocations(f, snapshot, current, peak)
+            print(f"[INFO] Profile written to {out_dir}")
+        finally:
+            self._written.set()
+
+
+def _fold(thread_name, frame):
+    """One sampled stack as ``thread;outer;...;inner``"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    names.append(thread_name)
+    return ";".join(reversed(names)).replace(" ", "_")
+
+def write_allocations(f, snapshot, current, peak, limit=30):
+    import tracemalloc
+
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ])
+    f.write(f"Traced memory: {current / 1024:.0f} KiB current, {peak / 1024:.0f} KiB peak\n\n")
+    f.write(f"Top {limit} lines by live allocation:\n")
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}\n")
+    f.write("\nTop 10 allocation tracebacks:\n")
+    for stat in snapshot.statistics("traceback")[:10]:
+        f.write(f"\n{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+        for line in stat.traceback.format(most_recent_first=True)[:TRACE_FRAMES * 2]:
+            f.write(f"    {line}\n")
+
+# ----------------------------
+# Command line
+# ----------------------------
+def add_argument(parser):
+    parser.add_argument("--profile", nargs="?", type=float, const=DEFAULT_SECONDS, metavar="SECONDS",
+                        help=f"profile startup and the first SECONDS (default {DEFAULT_SECONDS}) "
+                             "into ~/.cache/odb/profiles")
+
+def start_from_argv(argv=None):
+    """Start a Profiler if ``--profile[=SECONDS]`` is on the command line.
+
+    Called before the entry point's heavy imports so that they are part of
+    the profile; argparse still declares the flag through ``add_argument``.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg == "--profile" or arg.startswith("--profile="):
+            value = arg.partition("=")[2] or (argv[i + 1] if i + 1 < len(argv) else "")
+            try:
+                seconds = float(value)
+            except ValueError:
+                seconds = DEFAULT_SECONDS
+            return Profiler(seconds).start()
+    return None
@@ -0,0 +1 @@
+"""PyQt5 helpers for the viewers (kept apart so ``odb`` itself stays Qt-free)."""
@@ -0,0 +1,66 @@
+import threading
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from odb import fetch
+from odb.display import scale_image
+from odb.extract import page_details
+from odb.feed import FEED_URL
+from odb.feedwatch import FeedWatcher
+
+# ----------------------------
+# Live feed updates
+# ----------------------------
+class LiveFeed(QObject):
+    """Runs a FeedWatcher in a thread and hands new devotionals to the GUI.
+
+    Everything that needs the network (the page, the image, the MP3 probe)
+    is done in the polling thread; ``updated`` then delivers a complete
+    record to the GUI thread, with the scaled image as ``image_png``.
+    With a LAN ``mirror`` both the polling and the record come from it.
+    """
+
+    updated = pyqtSignal(dict)
+
+    def __init__(self, current, mirror=None, parent=None):
+        super().__init__(parent)
+        self.mirror = mirror
+        if mirror:
+            from odb.mirror import mirror_feed_url
+
+            self.watcher = FeedWatcher(current, mirror_feed_url(mirror))
+        else:
+            self.watcher = FeedWatcher(current, FEED_URL)
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.watcher.watch, args=(self.found, self.stop_event),
+                                       name="odb-live-feed", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def found(self, item):
+        from odb.mp3probe import audio_metadata
+
+        record = dict(item)
+        try:
+            if self.mirror:
+                from odb.mirror import mirror_records
+
+                record = next(r for r in mirror_records(self.mirror, 1) if r["guid"] == item["guid"])
+            else:
+                record.update(page_details(item["link"]))
+        except Exception as e:
+            print(f"[WARNING] Could not extract {item['link']}: {e}")
+            record.update(mp3_url=None, bible_link=None, bible_in_one_year=None)
+        if record.get("mp3_url"):
+            record["audio"] = audio_metadata(record, record["mp3_url"])
+        if record.get("image"):
+            try:
+                record["image_png"] = scale_image(fetch.get(record["image"], kind="image").content)
+            except Exception as e:
+                print(f"[ERROR] Could not load image: {e}")
+        self.updated.emit(record)
@@ -0,0 +1,92 @@
+import getpass
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+SERVER_NAME = f"odb-devotional-viewer-{getpass.getuser()}"
+
+# ----------------------------
+# Single-instance handshake
+# ----------------------------
+def show_running_instance(timeout=100):
+    """Ask a resident viewer to show its window; True if one answered.
+
+    Only needs QtCore and QtNetwork, so a second launch can hand over to
+    the running instance before importing anything heavy.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(SERVER_NAME)
+    if not socket.waitForConnected(timeout):
+        return False
+    socket.write(b"show\n")
+    socket.waitForBytesWritten(timeout)
+    socket.disconnectFromServer()
+    return True
+
+
+class ResidentServer(QObject):
+    """Keeps a viewer alive in the system tray and re-shows it on request.
+
+    With a tray icon, closing the window only hides it; the parsed
+    devotional, pixmaps, connection pool and player all stay warm for the
+    next launch.  Without a tray there would be no way back to a hidden
+    viewer, so closing it quits as usual.
+    """
+
+    def __init__(self, app, window):
+        from PyQt5.QtWidgets import QAction, QMenu, QStyle, QSystemTrayIcon
+
+        super().__init__()
+        self.app = app
+        self.window = window
+
+        self.server = QLocalServer(self)
+        if not self.server.listen(SERVER_NAME):
+            # Left behind by a crashed instance; nobody answered our handshake
+            QLocalServer.removeServer(SERVER_NAME)
+            self.server.listen(SERVER_NAME)
+        self.server.newConnection.connect(self.accept)
+
+        self.tray = None
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            app.setQuitOnLastWindowClosed(False)
+            self.tray = QSystemTrayIcon(app.style().standardIcon(QStyle.SP_MediaPlay), self)
+            self.tray.setToolTip(window.windowTitle())
+            menu = QMenu()
+            show_action = QAction("Show", menu)
+            show_action.triggered.connect(self.show_window)
+            quit_action = QAction("Quit", menu)
+            quit_action.triggered.connect(app.quit)
+            menu.addAction(show_action)
+            menu.addAction(quit_action)
+            self.menu = menu
+            self.tray.setContextMenu(menu)
+            self.tray.activated.connect(self.tray_activated)
+            self.tray.show()
+        else:
+            print("[WARNING] No system tray; the viewer quits when its window is closed.")
+
+    def accept(self):
+        connection = self.server.nextPendingConnection()
+        connection.readyRead.connect(lambda: self.handle(connection))
+        connection.disconnected.connect(connection.deleteLater)
+        if connection.bytesAvailable():
+            self.handle(connection)
+
+    def handle(self, connection):
+        if b"show" in bytes(connection.readAll()):
+            self.show_window()
+
+    def tray_activated(self, reason):
+        from PyQt5.QtWidgets import QSystemTrayIcon
+
+        if reason == QSystemTrayIcon.Trigger:
+            if self.window.isVisible() and not self.window.isMinimized():
+                self.window.hide()
+            else:
+                self.show_window()
+
+    def show_window(self):
+        self.window.showNormal()
+        self.window.raise_()
+        self.window.activateWindow()
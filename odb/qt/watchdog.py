@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import threading
+import traceback
+from collections import Counter
+
+from PyQt5.QtCore import QObject, QTimer
+
+from odb import trace
+from odb.cache import cache_dir
+
+# Report the GUI thread when it does not get back to the event loop within (ms)
+STALL_MS = int(os.environ.get("ODB_STALL_MS", "100"))
+
+# ----------------------------
+# Event-loop stall watchdog
+# ----------------------------
+class StallWatchdog(QObject):
+    """Catches the GUI thread blocking the Qt event loop, with evidence.
+
+    A QTimer on the GUI thread records a heartbeat every ``threshold / 2``.
+    A plain thread watches it; once the heartbeat is ``threshold`` late it
+    samples the GUI thread's Python stack through ``sys._current_frames()``
+    until the loop comes back.  Each stall is then logged with its length
+    and the stacks it was stuck in, appended to ``<cache>/stalls.log`` and
+    added to the Chrome trace when tracing is on.
+    """
+
+    def __init__(self, threshold_ms=STALL_MS, parent=None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.interval = self.threshold / 2
+        self.gui_thread = threading.get_ident()
+        self.stalls = []
+        self._samples = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._beat = time.monotonic()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(int(self.interval * 1000))
+        self.timer.timeout.connect(self.heartbeat)
+
+    def start(self):
+        self._beat = time.monotonic()
+        self.timer.start()
+        threading.Thread(target=self._watch, name="odb-stall-watchdog", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self.timer.stop()
+
+    def heartbeat(self):
+        """Runs on the GUI thread whenever the event loop is responsive"""
+        now = time.monotonic()
+        late = now - self._beat - self.interval
+        self._beat = now
+        with self._lock:
+            samples, self._samples = self._samples, Counter()
+        if late >= self.threshold:
+            self.report(late * 1000, samples)
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 4):
+            if time.monotonic() - self._beat - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self.gui_thread)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            with self._lock:
+                self._samples[stack] += 1
+
+    def report(self, stall_ms, samples):
+        """Log one stall and the stack(s) the GUI thread was seen in"""
+        stacks = [stack for stack, _ in samples.most_common()]
+        self.stalls.append({"ms": stall_ms, "stacks": stacks})
+        print(f"[WARNING] GUI thread blocked for {stall_ms:.0f} ms")
+        if stacks:
+            print(stacks[0], end="")
+        trace.instant("GUI stall", ms=round(stall_ms), stack=stacks[0] if stacks else "")
+
+        lines = [f"{time.strftime('%Y-%m-%d %H:%M:%S')} blocked for {stall_ms:.0f} ms"]
+        for stack, count in samples.most_common():
+            lines.append(f"  seen in {count} sample(s):")
+            lines.extend("  " + line for line in stack.splitlines())
+        with open(os.path.join(cache_dir(), "stalls.log"), "a") as f:
+            f.write("\n".join(lines) + "\n\n")
@@ -0,0 +1,217 @@
+"""Local record/replay stand-in for the ODB servers.
+
+``python3 -m odb replay`` serves recorded responses for every URL the apps
+fetch (both feeds, pages, playlists, images, audio) from a store directory:
+
+    <dir>/index.json   {"<original url>": {"file": "...", "content_type": "...", "status": 200}}
+    <dir>/<file>       the recorded body, path relative to <dir>
+
+Set ``ODB_REPLAY=http://127.0.0.1:<port>`` and ``odb.fetch`` sends every
+request there instead, as ``/<scheme>/<host>/<path>?<query>``.  Per-request
+latency and a bandwidth cap make slow networks reproducible; ETag /
+If-None-Match and single byte ranges behave like a real origin.  With
+``--record`` a miss is fetched from the real server and added to the store.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import mimetypes
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from odb.cache import parse_range, url_key
+
+CHUNK_SIZE = 16 * 1024
+
+# ----------------------------
+# URL mapping
+# ----------------------------
+def replay_url(base, url):
+    """Where ``url`` lives on the replay server at ``base``"""
+    parts = urlsplit(url)
+    path = f"{base.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+    return f"{path}?{parts.query}" if parts.query else path
+
+def original_url(path):
+    """Inverse of ``replay_url`` for a request path"""
+    match = re.match(r"^/(https?)/([^/]+)(/.*)$", path)
+    if not match:
+        return None
+    scheme, netloc, rest = match.groups()
+    return f"{scheme}://{netloc}{rest}"
+
+# ----------------------------
+# Recorded responses
+# ----------------------------
+class ReplayStore:
+    """Recorded bodies and their index, loaded once and kept in memory"""
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        self.index_path = os.path.join(root, "index.json")
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        self.bodies = {}
+
+    def get(self, url):
+        """(status, content type, body, etag) for a recorded URL, or None"""
+        with self.lock:
+            entry = self.index.get(url)
+            if entry is None:
+                return None
+            if entry["file"] not in self.bodies:
+                with open(os.path.join(self.root, entry["file"]), "rb") as f:
+                    body = f.read()
+                self.bodies[entry["file"]] = (body, '"%s"' % hashlib.sha1(body).hexdigest()[:16])
+            body, etag = self.bodies[entry["file"]]
+        content_type = entry.get("content_type") or mimetypes.guess_type(entry["file"])[0]
+        return entry.get("status", 200), content_type or "application/octet-stream", body, etag
+
+    def record(self, url):
+        """Fetch ``url`` from the real server and add it to the store"""
+        import requests
+
+        from odb.fetch import HEADERS
+
+        response = requests.get(url, headers=HEADERS, timeout=30)
+        ext = os.path.splitext(urlsplit(url).path)[1] or ".bin"
+        name = os.path.join("recorded", url_key(url) + ext)
+        os.makedirs(os.path.join(self.root, "recorded"), exist_ok=True)
+        with open(os.path.join(self.root, name), "wb") as f:
+            f.write(response.content)
+        with self.lock:
+            self.index[url] = {
+                "file": name,
+                "content_type": response.headers.get("Content-Type", ""),
+                "status": response.status_code,
+            }
+            with open(self.index_path + ".tmp", "w") as f:
+                json.dump(self.index, f, indent=1, sort_keys=True)
+            os.replace(self.index_path + ".tmp", self.index_path)
+        print(f"[INFO] Recorded {url} ({len(response.content)} bytes)")
+
+# ----------------------------
+# Server
+# ----------------------------
+class ReplayServer:
+    """Serves a ReplayStore with injected latency and a bandwidth cap.
+
+    ``latency_ms`` is added before every response; ``bandwidth`` (bytes per
+    second, 0 = unlimited) paces each response body separately.
+    """
+
+    def __init__(self, root, host="127.0.0.1", port=0, latency_ms=0, bandwidth=0, record=False):
+        self.store = ReplayStore(root)
+        self.latency = latency_ms / 1000
+        self.bandwidth = bandwidth
+        self.recording = record
+        self.server = ThreadingHTTPServer((host, port), _ReplayHandler)
+        self.server.daemon_threads = True
+        self.server.replay = self
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def lookup(self, url):
+        found = self.store.get(url)
+        if found is None and self.recording:
+            try:
+                self.store.record(url)
+            except Exception as e:
+                print(f"[ERROR] Could not record {url}: {e}")
+            found = self.store.get(url)
+        return found
+
+    def send(self, out, data):
+        """Write ``data`` to ``out``, no faster than the bandwidth cap"""
+        if not self.bandwidth:
+            out.write(data)
+            return
+        start = time.monotonic()
+        for offset in range(0, len(data), CHUNK_SIZE):
+            out.write(data[offset:offset + CHUNK_SIZE])
+            ahead = (offset + CHUNK_SIZE) / self.bandwidth - (time.monotonic() - start)
+            if ahead > 0:
+                time.sleep(ahead)
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        replay = self.server.replay
+        if replay.latency:
+            time.sleep(replay.latency)
+
+        url = original_url(self.path)
+        found = replay.lookup(url) if url else None
+        if found is None:
+            print(f"[WARNING] Not recorded: {url or self.path}")
+            self.send_error(404)
+            return
+        status, content_type, body, etag = found
+
+        if status == 200 and etag in self.headers.get("If-None-Match", ""):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        size = len(body)
+        start, end = 0, size
+        range_status = 200
+        if status == 200:
+            range_status, start, end = parse_range(self.headers.get("Range"), size)
+        if range_status == 416:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if range_status == 206:
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        else:
+            self.send_response(status)
+
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if send_body:
+            try:
+                replay.send(self.wfile, memoryview(body)[start:end])
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+    def log_message(self, format, *args):
+        pass
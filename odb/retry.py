@@ -0,0 +1,108 @@
+"""Backoff, Retry-After and per-host circuit breaking for ``odb.fetch``.
+
+Written for fleets of kiosks that all start at once: retries use full
+jitter (a random delay up to an exponentially growing cap) so clients
+spread out instead of retrying in step, a server's Retry-After is obeyed,
+and after repeated failures a host's circuit opens so requests fail fast
+(and callers fall back to cached copies) instead of piling on.
+"""
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+
+import requests
+
+RETRIES = int(os.environ.get("ODB_RETRIES", "3"))
+BACKOFF_BASE_S = 1.0
+BACKOFF_CAP_S = 30.0
+# Waiting longer than this inside a request is worse than failing it
+MAX_RETRY_AFTER_S = 60.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN_S = 60.0
+BREAKER_MAX_COOLDOWN_S = 900.0
+
+
+class CircuitOpen(requests.ConnectionError):
+    """Raised without touching the network while a host's circuit is open"""
+
+
+def backoff_delay(attempt):
+    """Full-jitter exponential backoff for retry number ``attempt`` (0-based)"""
+    return random.uniform(0, min(BACKOFF_CAP_S, BACKOFF_BASE_S * 2 ** attempt))
+
+def retry_after(response):
+    """Seconds requested by a Retry-After header, or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+# ----------------------------
+# Circuit breaker
+# ----------------------------
+class CircuitBreaker:
+    """Closed -> open after ``failures`` in a row -> one trial after the cooldown.
+
+    Each consecutive trip doubles the cooldown (with jitter) up to
+    ``max_cooldown``; a success closes the circuit again.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN_S,
+                 max_cooldown=BREAKER_MAX_COOLDOWN_S):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.lock = threading.Lock()
+        self.failed = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.trial = False
+
+    def allow(self):
+        """True if a request may go out now"""
+        with self.lock:
+            if time.monotonic() < self.open_until:
+                return False
+            if self.failed >= self.failures:
+                # Half-open: let exactly one request find out if it recovered
+                if self.trial:
+                    return False
+                self.trial = True
+            return True
+
+    def success(self):
+        with self.lock:
+            self.failed = 0
+            self.trips = 0
+            self.trial = False
+            self.open_until = 0.0
+
+    def failure(self, wait=None):
+        """Count a failure; ``wait`` opens the circuit for at least that long"""
+        with self.lock:
+            self.failed += 1
+            self.trial = False
+            if self.failed >= self.failures or wait:
+                cooldown = min(self.cooldown * 2 ** self.trips, self.max_cooldown)
+                cooldown = max(random.uniform(cooldown / 2, cooldown), wait or 0)
+                self.trips += 1
+                self.open_until = time.monotonic() + cooldown
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def breaker_for(host):
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
@@ -0,0 +1,158 @@
+"""Prioritized, cancellable downloads.
+
+Jobs are queued in priority classes: text (feed, page, playlist) before
+images before audio before prefetching.  Each class has its own concurrency
+limit, and a job only starts when no job of a more urgent class is still
+waiting, so a hero image or the next track's prefetch never holds up the
+page that holds the MP3 URL.
+
+Every job can carry a CancelToken.  Cancelling it drops the token's queued
+jobs at once; running downloads that were given the token (fetch.download,
+audio_proxy.fill) close their connection and stop at the next chunk.  The
+viewers hold one token per devotional shown and cancel it when the user
+moves on, which frees the bandwidth for the devotional now on screen.
+
+PREFETCH jobs run as background transfers (odb.bandwidth): capped by the
+background budget and paused while anything in the foreground downloads.
+"""
+import threading
+from concurrent.futures import Future
+
+from odb import bandwidth
+
+TEXT, IMAGE, AUDIO, PREFETCH = range(4)
+LIMITS = {TEXT: 4, IMAGE: 2, AUDIO: 2, PREFETCH: 1}
+
+
+class Cancelled(Exception):
+    """The job's CancelToken was cancelled"""
+
+
+class CancelToken:
+    """Cancellation shared by the downloads for one thing on screen.
+
+    A token made with a ``parent`` is cancelled along with it (a viewer's
+    lifetime token, say, and the token of the devotional it shows).
+    """
+
+    def __init__(self, parent=None):
+        self.lock = threading.Lock()
+        self.cancelled = False
+        self.callbacks = []
+        self.parent = parent
+        if parent is not None:
+            parent.on_cancel(self.cancel)
+
+    def cancel(self):
+        with self.lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[WARNING] Cancel callback failed: {e}")
+        if self.parent is not None:
+            self.parent.remove(self.cancel)
+
+    def on_cancel(self, callback):
+        """Call ``callback`` on cancel (now, if already cancelled)"""
+        with self.lock:
+            if not self.cancelled:
+                self.callbacks.append(callback)
+                return callback
+        callback()
+        return callback
+
+    def remove(self, callback):
+        with self.lock:
+            if callback in self.callbacks:
+                self.callbacks.remove(callback)
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+
+class Scheduler:
+    """Runs submitted jobs in priority order within per-class limits"""
+
+    def __init__(self, limits=LIMITS):
+        self.limits = dict(limits)
+        self.lock = threading.Lock()
+        self.queue = []  # (priority, sequence, job), kept sorted
+        self.running = dict.fromkeys(self.limits, 0)
+        self.sequence = 0
+
+    def submit(self, priority, token, fn, *args, **kwargs):
+        """Queue ``fn(*args, **kwargs)``; returns a concurrent.futures.Future"""
+        future = Future()
+        if token is not None:
+            callback = token.on_cancel(future.cancel)
+            future.add_done_callback(lambda f: token.remove(callback))
+        with self.lock:
+            self.sequence += 1
+            self.queue.append((priority, self.sequence, (fn, args, kwargs, token, future)))
+            self.queue.sort(key=lambda entry: entry[:2])
+            self._dispatch()
+        return future
+
+    def pending(self):
+        """Queued (not yet started) jobs per class"""
+        with self.lock:
+            counts = dict.fromkeys(self.limits, 0)
+            for priority, _, job in self.queue:
+                counts[priority] += 0 if job[4].cancelled() else 1
+            return counts
+
+    def _dispatch(self):
+        waiting = []
+        blocked_after = None  # most urgent class that still has to wait
+        for entry in self.queue:
+            priority, _, job = entry
+            if job[4].cancelled():
+                continue
+            urgent_waiting = blocked_after is not None and blocked_after < priority
+            if self.running[priority] < self.limits[priority] and not urgent_waiting:
+                self.running[priority] += 1
+                threading.Thread(target=self._run, args=(priority, job), daemon=True,
+                                 name=f"odb-download-{priority}").start()
+            else:
+                waiting.append(entry)
+                if blocked_after is None:
+                    blocked_after = priority
+        self.queue = waiting
+
+    def _run(self, priority, job):
+        fn, args, kwargs, token, future = job
+        try:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                if token is not None:
+                    token.check()
+                if priority == PREFETCH:
+                    with bandwidth.background():
+                        future.set_result(fn(*args, **kwargs))
+                else:
+                    future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+        finally:
+            with self.lock:
+                self.running[priority] -= 1
+                self._dispatch()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """The process-wide scheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
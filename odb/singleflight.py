@@ -0,0 +1,70 @@
+"""Single-flight: concurrent calls for the same key share one execution.
+
+Used by ``odb.fetch`` so two components asking for the same URL at the same
+moment cause one download, and by ``odb.extract`` so a page is fetched and
+parsed once however many fields are read from it.
+"""
+import time
+import threading
+
+# Finished results kept with a ttl are swept once there are this many keys
+SWEEP_AT = 64
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.expires = 0.0
+
+
+class SingleFlight:
+    """Runs ``fn`` once per key at a time; callers arriving meanwhile get its result.
+
+    With ``ttl`` (seconds) a successful result is also kept that long after
+    it completes, so calls in quick succession share it as well.  Errors are
+    never kept.
+    """
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn, *args, **kwargs):
+        """(result, shared); ``shared`` is True if another caller's run was reused"""
+        now = time.monotonic()
+        with self.lock:
+            if len(self.calls) >= SWEEP_AT:
+                self._sweep(now)
+            call = self.calls.get(key)
+            if call is not None and call.done.is_set() and now >= call.expires:
+                call = None
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            call.expires = time.monotonic() + self.ttl
+            with self.lock:
+                if (call.error is not None or not self.ttl) and self.calls.get(key) is call:
+                    del self.calls[key]
+            call.done.set()
+        return call.result, False
+
+    def _sweep(self, now):
+        for key, call in list(self.calls.items()):
+            if call.done.is_set() and now >= call.expires:
+                del self.calls[key]
@@ -0,0 +1,270 @@
+"""Race the two devotional feeds and follow whichever is answering best.
+
+The WordPress feed (ourdailybreadministries.ca, used by two.py-six.py) and
+the ODB API feed (api.experience.odb.org, used by one.py) carry the same
+devotionals.  Both are turned into the same record: the WordPress fields
+plus ``source`` naming the feed it came from.  ``link`` is whatever the
+feed gave; where both feeds list a devotional the WordPress link and guid
+(the ourdailybreadministries.ca page that holds the MP3) are kept.  API
+links do not lead to that page, so when the API feed wins the race its
+answer waits up to ``LINK_WAIT_S`` for the WordPress feed to match it.
+
+Each feed's latency and error rate are tracked as moving averages (kept in
+``~/.cache/odb/sources.json`` so the next start knows them too).  The
+healthiest, fastest feed is asked first; if it has not answered within
+``HEDGE_FACTOR`` times its usual latency the other one is asked as well,
+and whichever answers first wins.  When both answers are in, duplicates
+are merged by date and title.
+"""
+import os
+import re
+import json
+import time
+import queue
+import hashlib
+import threading
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from odb import feed, fetch
+from odb.cache import cache_dir
+
+# Weight of the newest sample in the moving averages
+EWMA_ALPHA = 0.3
+# Ask the next feed too once the first is this many times slower than usual...
+HEDGE_FACTOR = 2.0
+# ...but never sooner than this, and after this long for a feed we know nothing about
+HEDGE_MIN_S = 0.25
+HEDGE_UNKNOWN_S = 1.0
+# A feed failing this often is only asked after the healthy ones
+UNHEALTHY_ERRORS = 0.5
+# How long an answer without page links waits for the WordPress feed
+LINK_WAIT_S = 2.0
+
+# ----------------------------
+# One record type for both feeds
+# ----------------------------
+def from_wordpress(response, count):
+    return [dict(item, source="wordpress") for item in feed.parse_feed(response.text, count)]
+
+def from_api(response, count):
+    return [dict(item, guid=item["link"], creator=item["creator"] or "Unknown", source="api")
+            for item in feed.parse_api_feed(response.content, count)]
+
+def parser_for(feed_url):
+    """from_api for the ODB API feed's host, from_wordpress for anything else"""
+    if urlsplit(feed_url).netloc == urlsplit(feed.API_FEED_URL).netloc:
+        return from_api
+    return from_wordpress
+
+def record_key(record):
+    """Same devotional, same key: the publication date (in UTC) and title"""
+    try:
+        published = parsedate_to_datetime(record["pubDate"])
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        day = published.astimezone(timezone.utc).strftime("%Y-%m-%d")
+    except (KeyError, TypeError, ValueError):
+        day = record.get("pubDate", "")
+    title = re.sub(r"\W+", " ", record.get("title", "")).strip().casefold()
+    return hashlib.sha1(f"{day}|{title}".encode("utf-8")).hexdigest()[:16]
+
+def reconcile(*lists):
+    """Merge record lists, newest first; earlier lists win, later ones fill gaps.
+
+    The link and guid of a devotional both feeds list always come from
+    WordPress, so the page with the MP3 is the one looked up.
+    """
+    merged = {}
+    for records in lists:
+        for record in records:
+            key = record_key(record)
+            if key not in merged:
+                merged[key] = dict(record)
+                continue
+            for name, value in record.items():
+                if value and not merged[key].get(name):
+                    merged[key][name] = value
+            if record.get("source") == "wordpress":
+                merged[key].update(link=record["link"], guid=record["guid"])
+
+    def published(record):
+        try:
+            return parsedate_to_datetime(record["pubDate"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0
+    return sorted(merged.values(), key=published, reverse=True)
+
+# ----------------------------
+# Per-feed health
+# ----------------------------
+class Source:
+    """A feed, how to read it, and how it has been behaving.
+
+    ``pages`` is True when the feed links to the pages that hold the MP3.
+    """
+
+    def __init__(self, name, url, parse, pages=True):
+        self.name = name
+        self.url = url
+        self.parse = parse
+        self.pages = pages
+        self.latency = None  # seconds, moving average
+        self.errors = 0.0  # failure rate, moving average
+        self.samples = 0
+
+    def observe(self, seconds, ok):
+        with _stats_lock:
+            if ok:
+                self.latency = seconds if self.latency is None else (
+                    EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self.latency)
+            self.errors = EWMA_ALPHA * (0.0 if ok else 1.0) + (1 - EWMA_ALPHA) * self.errors
+            self.samples += 1
+
+    def healthy(self):
+        return self.errors < UNHEALTHY_ERRORS
+
+    def hedge_after(self):
+        """Seconds to wait for this feed before asking the next one too"""
+        if self.latency is None:
+            return HEDGE_UNKNOWN_S
+        return max(HEDGE_MIN_S, self.latency * HEDGE_FACTOR)
+
+    def rank(self):
+        latency = self.latency if self.latency is not None else HEDGE_UNKNOWN_S
+        return (not self.healthy(), latency)
+
+
+SOURCES = [
+    Source("wordpress", feed.FEED_URL, from_wordpress),
+    Source("api", feed.API_FEED_URL, from_api, pages=False),
+]
+_stats_lock = threading.Lock()
+_loaded = False
+
+def stats_path():
+    return os.path.join(cache_dir(), "sources.json")
+
+def load_stats(sources=SOURCES):
+    global _loaded
+    with _stats_lock:
+        if _loaded:
+            return
+        _loaded = True
+        try:
+            with open(stats_path()) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for source in sources:
+            stats = saved.get(source.name, {})
+            source.latency = stats.get("latency")
+            source.errors = stats.get("errors", 0.0)
+            source.samples = stats.get("samples", 0)
+
+def save_stats(sources=SOURCES):
+    with _stats_lock:
+        stats = {source.name: {"latency": source.latency, "errors": source.errors,
+                               "samples": source.samples} for source in sources}
+        path = stats_path()
+        try:
+            with open(path + ".tmp", "w") as f:
+                json.dump(stats, f)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            print(f"[WARNING] Could not save feed statistics: {e}")
+
+# ----------------------------
+# The race
+# ----------------------------
+def _ask(source, count, results):
+    start = time.perf_counter()
+    try:
+        response = fetch.get(source.url, kind="feed")
+        response.raise_for_status()
+        records = source.parse(response, count)
+    except Exception as e:
+        source.observe(time.perf_counter() - start, ok=False)
+        save_stats()
+        results.put((source, None, False, e))
+        return
+    # A stale copy means the origin is failing; usable, but only as a last resort
+    stale = fetch.is_stale(response)
+    source.observe(time.perf_counter() - start, ok=not stale)
+    save_stats()
+    if not stale:
+        feed.last_validators[source.url] = (response.headers.get("ETag"),
+                                            response.headers.get("Last-Modified"))
+    results.put((source, records, stale, None))
+
+def fetch_items(count, sources=None):
+    """The newest ``count`` devotionals from whichever feed answers first"""
+    load_stats()
+    ranked = sorted(sources or SOURCES, key=Source.rank)
+    results = queue.Queue()
+    asked = []
+
+    def ask(source):
+        asked.append(source)
+        threading.Thread(target=_ask, args=(source, count, results), daemon=True,
+                         name=f"odb-feed-{source.name}").start()
+
+    def ask_next():
+        ask(ranked[len(asked)])
+
+    ask_next()
+    answered = 0
+    winner = None
+    fallback = None
+    error = None
+    while answered < len(asked):
+        wait = asked[-1].hedge_after() if len(asked) < len(ranked) else None
+        try:
+            source, records, stale, problem = results.get(timeout=wait)
+        except queue.Empty:
+            print(f"[INFO] {asked[-1].name} feed is slow; asking {ranked[len(asked)].name} too")
+            ask_next()
+            continue
+        answered += 1
+        if records is not None and not stale:
+            winner = (source, records)
+            break
+        if records is not None:
+            fallback = fallback or (source, records)
+        else:
+            error = problem
+            print(f"[WARNING] {source.name} feed failed: {problem}")
+        if answered == len(asked) and len(asked) < len(ranked):
+            ask_next()
+
+    if winner is None and fallback is None:
+        raise error or Exception("No feed answered.")
+    source, records = winner or fallback
+    # Anything else that arrives in time only fills gaps in the winner.  An
+    # answer without page links waits a little for a feed that has them.
+    deadline = time.monotonic()
+    if not source.pages:
+        for other in ranked:
+            if other.pages and other not in asked:
+                ask(other)
+        if any(other.pages for other in asked):
+            deadline += LINK_WAIT_S
+    others = []
+    while answered < len(asked):
+        try:
+            other, other_records, stale, problem = results.get(
+                timeout=max(0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        answered += 1
+        if other_records is not None:
+            others.append(other_records)
+    if not source.pages and not others:
+        print(f"[WARNING] No page links from the other feeds; using {source.name} links")
+    print(f"[INFO] Feed from {source.name}")
+    return reconcile(records, *others)[:count]
+
+def fetch_first_item():
+    """Today's devotional from whichever feed answers first"""
+    return fetch_items(1)[0]
@@ -0,0 +1,131 @@
+"""Chrome trace-event recording of startup and request stages.
+
+Enable with ``ODB_TRACE=trace.json`` (or a ``--trace`` flag calling
+``enable``); the file is written at exit and opens in chrome://tracing or
+https://ui.perfetto.dev.  While disabled, ``span`` hands back a shared
+no-op context manager and ``traced`` functions cost one flag check.
+"""
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+
+_events = []
+_lock = threading.Lock()
+_path = None
+_pid = os.getpid()
+_named_threads = set()
+
+
+def enable(path):
+    """Start recording; events are written to ``path`` at exit"""
+    global _path
+    if _path is None:
+        atexit.register(write)
+    _path = path
+
+def enabled():
+    return _path is not None
+
+def _now_us():
+    return time.perf_counter_ns() / 1000.0
+
+def _record(event):
+    tid = threading.get_ident()
+    event["pid"] = _pid
+    event["tid"] = tid
+    with _lock:
+        if tid not in _named_threads:
+            _named_threads.add(tid)
+            _events.append({"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid,
+                            "args": {"name": threading.current_thread().name}})
+        _events.append(event)
+
+# ----------------------------
+# Spans
+# ----------------------------
+class _Span:
+    __slots__ = ("name", "cat", "args", "start")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = _now_us()
+        if exc_type is not None:
+            self.args["error"] = repr(exc)
+        _record({"name": self.name, "cat": self.cat, "ph": "X",
+                 "ts": self.start, "dur": end - self.start, "args": self.args})
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, cat="odb", **args):
+    """Context manager timing a block as a complete ("X") event"""
+    if _path is None:
+        return _NO_SPAN
+    return _Span(name, cat, args)
+
+def traced(name=None, cat="odb"):
+    """Decorator recording every call of a function as a span"""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _path is None:
+                return fn(*args, **kwargs)
+            with _Span(label, cat, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def instant(name, cat="odb", **args):
+    if _path is not None:
+        _record({"name": name, "cat": cat, "ph": "i", "s": "p", "ts": _now_us(), "args": args})
+
+def begin_async(name, id, cat="odb"):
+    """Start a span that ends elsewhere (e.g. in a Qt signal handler)"""
+    if _path is not None:
+        _record({"name": name, "cat": cat, "ph": "b", "id": id, "ts": _now_us()})
+
+def end_async(name, id, cat="odb"):
+    if _path is not None:
+        _record({"name": name, "cat": cat, "ph": "e", "id": id, "ts": _now_us()})
+
+# ----------------------------
+# Output
+# ----------------------------
+def write(path=None):
+    """Write the recorded events as Chrome trace JSON"""
+    path = path or _path
+    if not path:
+        return
+    with _lock:
+        events = list(_events)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print(f"[INFO] Trace written to {path}")
+
+
+if os.environ.get("ODB_TRACE"):
+    enable(os.environ["ODB_TRACE"])
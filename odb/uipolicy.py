@@ -0,0 +1,46 @@
+import os
+
+# Player position updates while the window is on screen / hidden (ms); the
+# labels show whole seconds, so Qt's default of 1000 ms is already enough
+# on screen
+UPDATE_MS = int(os.environ.get("ODB_UPDATE_MS", "1000"))
+HIDDEN_UPDATE_MS = int(os.environ.get("ODB_HIDDEN_UPDATE_MS", "60000"))
+
+# ----------------------------
+# Power-aware UI updates
+# ----------------------------
+class UpdatePolicy:
+    """Decides how often, and whether, playback widgets get refreshed.
+
+    While the window is visible the player notifies at ``visible_interval``;
+    once hidden or minimised the interval stretches to ``hidden_interval``
+    and updates are skipped entirely.  ``changed`` filters out repeated
+    values so widgets are only touched when what they show is different.
+    """
+
+    def __init__(self, visible_interval=UPDATE_MS, hidden_interval=HIDDEN_UPDATE_MS):
+        self.visible_interval = visible_interval
+        self.hidden_interval = hidden_interval
+        self.visible = True
+        self.shown = {}
+
+    @property
+    def interval(self):
+        return self.visible_interval if self.visible else self.hidden_interval
+
+    def set_visible(self, visible):
+        """Record visibility; returns True when it actually changed"""
+        if visible == self.visible:
+            return False
+        self.visible = visible
+        if visible:
+            # Widgets may be stale after a long hidden stretch
+            self.shown.clear()
+        return True
+
+    def changed(self, key, value):
+        """True (and remembered) if ``value`` differs from what is shown"""
+        if self.shown.get(key) == value:
+            return False
+        self.shown[key] = value
+        return True
@@ -1,35 +1,13 @@
 import sys
-import requests
-import xml.etree.ElementTree as ET
 from io import BytesIO
-from PIL import Image
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QVBoxLayout, QTextBrowser, QScrollArea
 )
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt
 
-FEED_URL = "https://api.experience.odb.org/devotionals/feed/?country=CA"
-
-def fetch_first_item():
-    response = requests.get(FEED_URL)
-    response.raise_for_status()
-
-    root = ET.fromstring(response.content)
-    item = root.find("./channel/item")
-
-    def get(tag):
-        el = item.find(tag)
-        return el.text if el is not None else ""
-
-    return {
-        "title": get("title"),
-        "creator": get("{http://purl.org/dc/elements/1.1/}creator"),
-        "description": get("description"),
-        "pubDate": get("pubDate"),
-        "image": get("image"),
-        "link": get("link")
-    }
+from odb import fetch
+from odb.sources import fetch_first_item
 
 class ODBViewer(QWidget):
     def __init__(self, data):
@@ -57,7 +35,9 @@ class ODBViewer(QWidget):
 
         # Image
         if data["image"]:
-            img_data = requests.get(data["image"]).content
+            from PIL import Image  # only needed when there is an image
+
+            img_data = fetch.get(data["image"], kind="image").content
             pil_img = Image.open(BytesIO(img_data))
             pil_img = pil_img.resize((750, 420))
             img_buffer = BytesIO()
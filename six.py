@@ -1,144 +1,72 @@
+import os
 import sys
-import requests
-from bs4 import BeautifulSoup
-from io import BytesIO
-from PIL import Image
-import re
-from urllib.parse import urlparse, parse_qs, unquote
+import argparse
+
+from odb import profiling
+from odb.qt.resident import ResidentServer, show_running_instance
+from odb.qt.watchdog import STALL_MS, StallWatchdog
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Our Daily Bread devotional viewer")
+    parser.add_argument("--days", type=int, default=0,
+                        help="queue this many previous days of audio after today")
+    parser.add_argument("--select", default="",
+                        help="comma separated feed positions to queue (0 = today)")
+    parser.add_argument("--resident", action="store_true",
+                        help="stay in the system tray; later launches re-show this window")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write a Chrome trace of startup to FILE (or set ODB_TRACE)")
+    parser.add_argument("--watchdog", nargs="?", type=int, const=STALL_MS, metavar="MS",
+                        help=f"log the stack whenever the GUI blocks for MS (default {STALL_MS}) or longer")
+    parser.add_argument("--no-live", action="store_true",
+                        help="do not watch the feed for the next day's devotional")
+    parser.add_argument("--mirror", metavar="URL", default=os.environ.get("ODB_MIRROR"),
+                        help="read everything from a LAN mirror (python3 -m odb mirror) instead")
+    profiling.add_argument(parser)
+    return parser.parse_known_args()
+
+if __name__ == "__main__":
+    args, qt_args = parse_args()
+    # A plain launch only asks a resident viewer to show itself; do that
+    # before paying for the imports below.  Anything else on the command
+    # line (--days, --mirror, --profile, ...) gets a viewer of its own.
+    if set(sys.argv[1:]) <= {"--resident"} and show_running_instance():
+        sys.exit(0)
+
+# Started this early so the imports below are part of a --profile run
+profiler = profiling.start_from_argv() if __name__ == "__main__" else None
 
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QTextBrowser, QVBoxLayout,
     QScrollArea, QPushButton, QHBoxLayout, QSlider
 )
 from PyQt5.QtGui import QPixmap
-from PyQt5.QtCore import Qt, QUrl
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
-
-FEED_URL = "https://ourdailybreadministries.ca/feed/"
-
-# ----------------------------
-# Utility Functions
-# ----------------------------
-
-def fetch_first_item():
-    """Fetch the first item from the feed"""
-    response = requests.get(FEED_URL, headers={"User-Agent": "Mozilla/5.0"})
-    response.raise_for_status()
-    soup = BeautifulSoup(response.text, "xml")
-
-    first_item = soup.find("item")
-    title = first_item.find("title").text.strip()
-    link = first_item.find("link").text.strip()
-    pubDate = first_item.find("pubDate").text.strip()
-    creator_tag = first_item.find("dc:creator")
-    creator = creator_tag.text.strip() if creator_tag else "Unknown"
-    description_tag = first_item.find("description")
-    description = description_tag.text.strip() if description_tag else ""
-    
-    # Optional: try to get image from description HTML
-    img_soup = BeautifulSoup(description, "html.parser")
-    img_tag = img_soup.find("img")
-
-    image_url = img_tag["src"] if img_tag else None
-
-    # The HTML content
-    html_content = first_item.find('content:encoded').text
-
-    # Parse it with BeautifulSoup
-    soup = BeautifulSoup(html_content, "html.parser")
-
-    # Example 1: Get the image URL inside <img class='today-img'>
-    img_tag = soup.find("img", class_="today-img")
-    if img_tag:
-        img_url = img_tag.get("src")
-        print("Image URL:", img_url)
-        image_url = img_url  # Override if found
-        
-    return {
-        "title": title,
-        "creator": creator,
-        "pubDate": pubDate,
-        "link": link,
-        "description": description,
-        "image": image_url
-    }
-
-
-def get_mp3_from_page(url):
-    """Extract the direct MP3 URL from the devotional page"""
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-
-    # Check playlist.json URL
-    match = re.search(r'https://ourdailybreadministries\.ca/\?load=playlist\.json[^\s"\']+', response.text)
-    if match:
-        playlist_url = match.group(0).replace("&#038;", "&")
-        parsed = urlparse(playlist_url)
-        qs = parse_qs(parsed.query)
-        if "feed" in qs and qs["feed"]:
-            mp3_url = unquote(qs["feed"][0])
-            print(f"[INFO] Direct MP3 URL: {mp3_url}")
-            return mp3_url
-
-    # fallback: search any .mp3
-    match2 = re.search(r'https?://[^\s"]+\.mp3', response.text)
-    if match2:
-        print(f"[INFO] Direct MP3 URL (fallback): {match2.group(0)}")
-        return match2.group(0)
-
-    print("[ERROR] Could not find MP3 URL")
-    return None
-
-def get_bible_link(url):
-    """Fetch Bible in 1 Year link if available"""
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-    if response.status_code != 200:
-        return None
-
-    soup = BeautifulSoup(response.text, "html.parser")
-    div = soup.find("div", class_="bible-link-box")
-    if div:
-        a_tag = div.find("a")
-        if a_tag and "bible" in a_tag.text.lower():
-            return a_tag.get("href").strip()
-    return None
-
-def format_time(ms):
-    s = int(ms / 1000)
-    m, s = divmod(s, 60)
-    h, m = divmod(m, 60)
-    if h > 0:
-        return f"{h:02}:{m:02}:{s:02}"
-    else:
-        return f"{m:02}:{s:02}"
-
-def get_bible_in_one_year(url):
-    """Fetch Bible in 1 Year link if available"""
-
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-
-    # Parse HTML
-    soup = BeautifulSoup(response.text, "html.parser")
-
-    # Find an element by class name
-    # Example: <div class="my-class">...</div>
-    element = soup.find(class_="bible-link-box")  # returns first matching element
-
-    # If you want all elements with that class
-    all_elements = soup.find_all(class_="bible-link-box")
-
-    # Access text
-    if element:
-        return element.get_text(strip=True)
-
-    # Access attributes, e.g. href for <a> tags
-    if element and element.name == "a":
-        return element.get("href")
+from PyQt5.QtCore import Qt, QUrl, QEvent, QTimer, pyqtSignal
+
+from odb import fetch, trace
+from odb.audio_proxy import get_proxy
+from odb.display import format_time, scale_image
+from odb.extract import get_mp3_from_page, page_details
+from odb.feed import FEED_URL
+from odb.feedwatch import changed_fields
+from odb.mp3probe import track_info
+from odb.playqueue import queue_for
+from odb.scheduler import IMAGE, TEXT, Cancelled, CancelToken, get_scheduler
+from odb.sources import fetch_items
+from odb.uipolicy import UpdatePolicy
 
 # ----------------------------
 # GUI Class
 # ----------------------------
 class ODBViewer(QWidget):
-    def __init__(self, data):
+    # (token, future) of a finished image download, page lookup or MP3
+    # probe, delivered to the GUI thread
+    image_ready = pyqtSignal(object, object)
+    details_ready = pyqtSignal(object, object)
+    audio_info_ready = pyqtSignal(object, object)
+
+    @trace.traced("ODBViewer.__init__")
+    def __init__(self, data, queue=None):
         super().__init__()
         self.setWindowTitle("ODB Devotional Viewer")
         self.setGeometry(200, 200, 400, 600)
@@ -149,85 +77,286 @@ class ODBViewer(QWidget):
         layout.setSpacing(15)
 
         # --- Title, Author, Date ---
-        title_label = QLabel(data["title"])
-        title_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #333;")
-        title_label.setWordWrap(True)
-        layout.addWidget(title_label)
+        self.title_label = QLabel()
+        self.title_label.setStyleSheet("font-size: 24px; font-weight: bold; color: #333;")
+        self.title_label.setWordWrap(True)
+        layout.addWidget(self.title_label)
 
-        author_label = QLabel(f"By: {data['creator']}")
-        author_label.setStyleSheet("font-size: 16px; color: #555;")
-        layout.addWidget(author_label)
+        self.author_label = QLabel()
+        self.author_label.setStyleSheet("font-size: 16px; color: #555;")
+        layout.addWidget(self.author_label)
 
-        date_label = QLabel(data["pubDate"])
-        date_label.setStyleSheet("font-size: 14px; color: gray;")
-        layout.addWidget(date_label)
+        self.date_label = QLabel()
+        self.date_label.setStyleSheet("font-size: 14px; color: gray;")
+        layout.addWidget(self.date_label)
 
         # --- Image ---
-        print(f"[INFO] Image URL: {data['image']}\n")
-        if data["image"]:
-            self.render_image(data["image"], layout)
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.image_label)
 
         # --- Description ---
-        text_browser = QTextBrowser()
-        text_browser.setHtml(data["description"])
-        text_browser.setMinimumHeight(400)
-        text_browser.setStyleSheet("background-color: #fff; border-radius: 8px; padding: 10px;")
+        self.text_browser = QTextBrowser()
+        self.text_browser.setMinimumHeight(400)
+        self.text_browser.setStyleSheet("background-color: #fff; border-radius: 8px; padding: 10px;")
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setWidget(text_browser)
+        scroll.setWidget(self.text_browser)
         layout.addWidget(scroll)
 
         # --- Bible Link ---
-        self.bible_link = get_bible_link(data["link"])
-        if self.bible_link:
-            bible_label = QLabel(f'<a href="{self.bible_link}" style="font-size:16px;">📖 Bible in 1 Year</a>')
-            bible_label.setOpenExternalLinks(True)
-            bible_label.setStyleSheet("color: #1a73e8; margin-top: 10px;")
-            layout.addWidget(bible_label)
-
-        # --- Audio Player ---
-        self.player = QMediaPlayer()
-        self.mp3_url = get_mp3_from_page(data["link"])
-        print(f"[INFO] MP3 URL assigned: {self.mp3_url}\n")
-  
+        self.bible_label = QLabel()
+        self.bible_label.setOpenExternalLinks(True)
+        self.bible_label.setStyleSheet("color: #1a73e8; margin-top: 10px;")
+        layout.addWidget(self.bible_label)
 
         # --- Bible in One Year Link ---#
-        yearlyBible = get_bible_in_one_year(data["link"])
-        print(f"[INFO] Yearly Bible Link: {yearlyBible}\n")
-        yearly_bible_label = QLabel(yearlyBible)
-        yearly_bible_label.setStyleSheet("font-size: 15px; color: blue;")
-        layout.addWidget(yearly_bible_label)
+        self.yearly_bible_label = QLabel()
+        self.yearly_bible_label.setStyleSheet("font-size: 15px; color: blue;")
+        layout.addWidget(self.yearly_bible_label)
+
+        # --- Audio Player (created with the first MP3) ---
+        self.player = None
+        self.audio_controls = None
+        self.playlist = None
+        self.update_policy = UpdatePolicy()
+
+        # Downloads for the devotional on screen use self.token; both it and
+        # anything still running go when the viewer does
+        self.lifetime = CancelToken()
+        self.token = None
+        self.destroyed.connect(self.lifetime.cancel)
+        self.image_ready.connect(self.show_image)
+        self.details_ready.connect(self.show_details)
+        self.audio_info_ready.connect(self.show_audio_info)
 
+        self.setLayout(layout)
+        self.refresh(data, queue)
 
-        self.create_audio_controls(layout)
-        self.player.positionChanged.connect(self.position_changed)
-        self.player.durationChanged.connect(self.duration_changed)
+    @trace.traced("ODBViewer.refresh")
+    def refresh(self, data, queue=None):
+        """Show a devotional, reusing the existing widgets and player"""
+        self.setWindowTitle("ODB Devotional Viewer")
+        # Whatever was still downloading for the previous devotional can stop
+        if self.token is not None:
+            self.token.cancel()
+        self.token = CancelToken(self.lifetime)
 
-        # Auto-play
-        if self.mp3_url:
-            self.play_audio()
+        self.title_label.setText(data["title"])
+        self.author_label.setText(f"By: {data['creator']}")
+        self.date_label.setText(data["pubDate"])
 
-        self.setLayout(layout)
+        print(f"[INFO] Image URL: {data['image']}\n")
+        self.image_label.clear()
+        self.image_label.setVisible(False)
+        if data["image"]:
+            self.load_image(data["image"])
+
+        self.text_browser.setHtml(data["description"])
+
+        self.queue = queue
+        self.seek_index = None
+        self.pending_details = None
+        if "mp3_url" in data:
+            # Mirror records arrive with the page already extracted
+            self.apply_details(data, data)
+            if self.mp3_url:
+                self.load_audio_info(data)
+            return
+
+        # Until the page is in: no Bible links and no audio from the last devotional
+        self.bible_link = self.mp3_url = None
+        self.bible_label.setVisible(False)
+        self.yearly_bible_label.setText("")
+        self.audio_meta = {}
+        self.devotional = dict(data, mp3_url=None, bible_link=None, bible_in_one_year=None)
+        self.load_audio(autoplay=False)
+        # The page (MP3 URL, Bible links) is queued ahead of the image
+        token = self.token
+        future = get_scheduler().submit(TEXT, token, self.fetch_details, data)
+        future.add_done_callback(lambda f: self.details_ready.emit(token, f))
+        self.pending_details = future
+
+    @staticmethod
+    def fetch_details(data):
+        """The page's details plus the MP3 header probe, off the GUI thread"""
+        details = page_details(data["link"])
+        # Probe the MP3 header so the duration is known before buffering
+        details["audio"], details["seek_index"] = (
+            track_info(data, details["mp3_url"]) if details["mp3_url"] else ({}, None))
+        return details
+
+    @trace.traced("show_details")
+    def show_details(self, token, future):
+        if token is not self.token or future.cancelled():
+            return
+        self.pending_details = None
+        try:
+            details = future.result()
+        except Cancelled:
+            return
+        except Exception as e:
+            print(f"[ERROR] Could not read devotional page: {e}")
+            return
+        self.apply_details(self.devotional, details)
 
-    def render_image(self, image_url, parent_layout):
+    def apply_details(self, data, details):
+        """Show the Bible links and load the audio found on the page"""
+        self.bible_link = details.get("bible_link")
+        if self.bible_link:
+            self.bible_label.setText(f'<a href="{self.bible_link}" style="font-size:16px;">📖 Bible in 1 Year</a>')
+        self.bible_label.setVisible(bool(self.bible_link))
+
+        self.mp3_url = details["mp3_url"]
+        print(f"[INFO] MP3 URL assigned: {self.mp3_url}\n")
+        self.audio_meta = details.get("audio") or {}
+        self.seek_index = details.get("seek_index")
+
+        yearlyBible = details.get("bible_in_one_year")
+        print(f"[INFO] Yearly Bible Link: {yearlyBible}\n")
+        self.yearly_bible_label.setText(yearlyBible or "")
+
+        self.devotional = dict(data, mp3_url=self.mp3_url, bible_link=self.bible_link,
+                               bible_in_one_year=yearlyBible)
+        self.load_audio(autoplay=True)
+
+    def update_devotional(self, record):
+        """Switch to a newer devotional, touching only the widgets that changed.
+
+        ``record`` comes from LiveFeed with the page already extracted and
+        the image already scaled (``image_png``), so nothing here blocks.
+        """
+        png = record.pop("image_png", None)
+        # Lookups still running for the previous devotional must not land on this one
+        self.token.cancel()
+        self.token = CancelToken(self.lifetime)
+        self.pending_details = None
+        changed = changed_fields(self.devotional, record)
+        self.devotional = record
+        print(f"[INFO] Updating: {', '.join(changed)}")
+
+        if "title" in changed:
+            self.title_label.setText(record["title"])
+        if "creator" in changed:
+            self.author_label.setText(f"By: {record['creator']}")
+        if "pubDate" in changed:
+            self.date_label.setText(record["pubDate"])
+        if "image" in changed:
+            self.image_label.clear()
+            if png:
+                pix = QPixmap()
+                pix.loadFromData(png)
+                self.image_label.setPixmap(pix)
+            self.image_label.setVisible(bool(png))
+        if "description" in changed:
+            self.text_browser.setHtml(record["description"])
+        if "bible_link" in changed:
+            self.bible_link = record["bible_link"]
+            if self.bible_link:
+                self.bible_label.setText(f'<a href="{self.bible_link}" style="font-size:16px;">📖 Bible in 1 Year</a>')
+            self.bible_label.setVisible(bool(self.bible_link))
+        if "bible_in_one_year" in changed:
+            self.yearly_bible_label.setText(record["bible_in_one_year"] or "")
+        if "mp3_url" in changed:
+            self.mp3_url = record["mp3_url"]
+            self.seek_index = None
+            self.audio_meta = record.get("audio", {})
+            # Loaded but not started: nobody asked for audio at this hour
+            self.load_audio(autoplay=False)
+            if self.mp3_url:
+                self.load_audio_info(record)
+
+    def load_audio(self, autoplay):
+        """Point the (reused) player and its controls at ``self.mp3_url``"""
+        if self.player is not None:
+            self.reset_player()
+        if self.mp3_url:
+            if self.player is None:
+                self.create_audio_controls(self.layout())
+                self.player.positionChanged.connect(self.position_changed)
+                self.player.durationChanged.connect(self.duration_changed)
+            self.audio_controls.show()
+            self.duration_changed(self.player.duration())
+
+            # Auto-play
+            if autoplay:
+                self.play_audio()
+        elif self.audio_controls is not None:
+            self.audio_controls.hide()
+
+    def load_audio_info(self, data):
+        """Probe the MP3 and build its seek index off the GUI thread, once per track"""
+        token = self.token
+        future = get_scheduler().submit(TEXT, token, self.fetch_audio_info, data, self.mp3_url)
+        future.add_done_callback(lambda f: self.audio_info_ready.emit(token, f))
+
+    @staticmethod
+    def fetch_audio_info(data, mp3_url):
+        return (mp3_url,) + track_info(data, mp3_url)
+
+    @trace.traced("show_audio_info")
+    def show_audio_info(self, token, future):
+        if token is not self.token or future.cancelled():
+            return
         try:
-            img_data = requests.get(image_url).content
-            pil_img = Image.open(BytesIO(img_data))
-            width = 750
-            height = int(pil_img.height * (width / pil_img.width))
-            pil_img = pil_img.resize((width, height))
-            img_buffer = BytesIO()
-            pil_img.save(img_buffer, format="PNG")
-            pix = QPixmap()
-            pix.loadFromData(img_buffer.getvalue())
-            img_label = QLabel()
-            img_label.setPixmap(pix)
-            img_label.setAlignment(Qt.AlignCenter)
-            parent_layout.addWidget(img_label)
+            mp3_url, meta, seek_index = future.result()
+        except Cancelled:
+            return
+        except Exception as e:
+            print(f"[WARNING] Could not probe MP3 header: {e}")
+            return
+        # A queue may have moved on to the next track meanwhile
+        if mp3_url != self.mp3_url:
+            return
+        self.audio_meta = meta
+        self.seek_index = seek_index
+        if self.player is not None:
+            self.duration_changed(self.player.duration())
+
+    def load_image(self, image_url):
+        """Download and scale an image off the GUI thread; show_image shows it"""
+        token = self.token
+        future = get_scheduler().submit(IMAGE, token, self.fetch_image, image_url, token)
+        future.add_done_callback(lambda f: self.image_ready.emit(token, f))
+
+    @staticmethod
+    def fetch_image(image_url, token):
+        with trace.span("image download", url=image_url):
+            img_data = fetch.download(image_url, "image", token)
+        with trace.span("image resize", bytes=len(img_data)):
+            return scale_image(img_data)
+
+    @trace.traced("show_image")
+    def show_image(self, token, future):
+        if token is not self.token or future.cancelled():
+            return
+        try:
+            png = future.result()
+        except Cancelled:
+            return
         except Exception as e:
             print(f"[ERROR] Could not load image: {e}")
+            return
+        with trace.span("pixmap load"):
+            pix = QPixmap()
+            pix.loadFromData(png)
+        self.image_label.setPixmap(pix)
+        self.image_label.setVisible(True)
 
+    @trace.traced("create_audio_controls")
     def create_audio_controls(self, parent_layout):
+        # QtMultimedia is only loaded once there is audio to play
+        from PyQt5.QtMultimedia import QMediaPlayer
+
+        self.player = QMediaPlayer()
+        self.player.setNotifyInterval(self.update_policy.interval)
+        self.player.mediaStatusChanged.connect(self.media_status_changed)
+
+        # Kept in one widget so a devotional without audio can hide them
+        self.audio_controls = QWidget()
+        controls_layout = QVBoxLayout(self.audio_controls)
+        controls_layout.setContentsMargins(0, 0, 0, 0)
+
         # Buttons
         button_layout = QHBoxLayout()
         button_layout.setSpacing(20)
@@ -245,14 +374,14 @@ class ODBViewer(QWidget):
         button_layout.addWidget(play_btn)
         button_layout.addWidget(pause_btn)
         button_layout.addWidget(stop_btn)
-        parent_layout.addLayout(button_layout)
+        controls_layout.addLayout(button_layout)
 
         # Progress Slider
         progress_layout = QHBoxLayout()
         self.position_label = QLabel("00:00")
         self.slider = QSlider(Qt.Horizontal)
         self.slider.setRange(0, 0)
-        self.slider.sliderMoved.connect(self.player.setPosition)
+        self.slider.sliderMoved.connect(self.seek)
         self.duration_label = QLabel("00:00")
         self.slider.setStyleSheet(
             "QSlider::groove:horizontal {height:8px; background:#ddd; border-radius:4px;}"
@@ -261,31 +390,164 @@ class ODBViewer(QWidget):
         progress_layout.addWidget(self.position_label)
         progress_layout.addWidget(self.slider)
         progress_layout.addWidget(self.duration_label)
-        parent_layout.addLayout(progress_layout)
+        controls_layout.addLayout(progress_layout)
+        parent_layout.addWidget(self.audio_controls)
+
+    def reset_player(self):
+        """Stop and unload the current audio so the player can be reused"""
+        from PyQt5.QtMultimedia import QMediaContent
+
+        self.player.stop()
+        if self.playlist is not None:
+            self.playlist.currentIndexChanged.disconnect(self.track_changed)
+            self.player.setPlaylist(None)
+            self.playlist = None
+        self.player.setMedia(QMediaContent())
+        self.slider.setRange(0, 0)
+        self.position_label.setText("00:00")
+        self.duration_label.setText("00:00")
+        self.update_policy.shown.clear()
 
     def play_audio(self):
+        from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+
         if self.mp3_url:
-            if self.player.mediaStatus() == QMediaPlayer.NoMedia:
-                self.player.setMedia(QMediaContent(QUrl(self.mp3_url)))
+            if self.queue and len(self.queue) > 1 and self.playlist is None:
+                self.load_queue()
+            elif self.player.mediaStatus() == QMediaPlayer.NoMedia:
+                # Play through the local proxy so seeks are served from cache
+                local_url = get_proxy().url_for(self.mp3_url)
+                self.player.setMedia(QMediaContent(QUrl(local_url)))
+                # A previously cached file knows its real duration up front
+                self.duration_changed(self.player.duration())
+            trace.begin_async("audio buffering", id(self.player))
             self.player.play()
         else:
             print("[ERROR] No MP3 found to play.")
 
+    def media_status_changed(self, status):
+        from PyQt5.QtMultimedia import QMediaPlayer
+
+        if status in (QMediaPlayer.BufferedMedia, QMediaPlayer.InvalidMedia):
+            trace.end_async("audio buffering", id(self.player))
+
+    def load_queue(self):
+        """Hands the whole queue to a QMediaPlaylist for gapless playback."""
+        from PyQt5.QtMultimedia import QMediaContent, QMediaPlaylist
+
+        self.playlist = QMediaPlaylist()
+        for entry in self.queue.entries:
+            local_url = get_proxy().url_for(entry["mp3_url"])
+            self.playlist.addMedia(QMediaContent(QUrl(local_url)))
+        self.playlist.setCurrentIndex(self.queue.index)
+        self.playlist.currentIndexChanged.connect(self.track_changed)
+        self.player.setPlaylist(self.playlist)
+        self.track_changed(self.queue.index)
+
+    def track_changed(self, index):
+        if index < 0:
+            # Played through the end of the queue
+            self.queue.discard()
+            return
+        entry = self.queue.select(index)
+        self.mp3_url = entry["mp3_url"]
+        self.seek_index = None
+        self.audio_meta = {}
+        self.load_audio_info(entry)
+        self.setWindowTitle(f"ODB Devotional Viewer - {entry['title']}")
+        self.duration_changed(self.player.duration())
+        # Have the following track cached before this one ends
+        self.queue.prefetch_next(self.token)
+
     def duration_changed(self, duration):
+        # Prefer the frame-scanned duration over the player's VBR estimate
+        if self.seek_index:
+            duration = self.seek_index.duration_ms
+        elif self.audio_meta.get("duration_ms"):
+            duration = self.audio_meta["duration_ms"]
         self.slider.setRange(0, duration)
         self.duration_label.setText(format_time(duration))
 
     def position_changed(self, position):
-        if not self.slider.isSliderDown():
+        if not self.update_policy.visible:
+            return
+        if self.seek_index:
+            position = self.seek_index.from_player(position, self.player.duration())
+        # Only move the slider when the handle would move by a pixel
+        step = max(1, self.slider.maximum() // max(self.slider.width(), 1))
+        if not self.slider.isSliderDown() and self.update_policy.changed("slider", position // step):
             self.slider.setValue(position)
-        self.position_label.setText(format_time(position))
+        text = format_time(position)
+        if self.update_policy.changed("position", text):
+            self.position_label.setText(text)
+
+    def seek(self, position):
+        if self.seek_index:
+            position = self.seek_index.to_player(position, self.player.duration())
+        self.player.setPosition(position)
+
+    # ----------------------------
+    # Low-power mode while hidden
+    # ----------------------------
+    def changeEvent(self, event):
+        if event.type() == QEvent.WindowStateChange:
+            self.visibility_changed()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.visibility_changed()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.visibility_changed()
+
+    def visibility_changed(self):
+        visible = self.isVisible() and not self.isMinimized()
+        if self.update_policy.set_visible(visible) and self.player is not None:
+            self.player.setNotifyInterval(self.update_policy.interval)
+            if visible:
+                self.position_changed(self.player.position())
 
 # ----------------------------
 # Run App
 # ----------------------------
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    devotional = fetch_first_item()
-    viewer = ODBViewer(devotional)
+    if args.trace:
+        trace.enable(args.trace)
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if profiler is not None:
+        # Before Python 3.12 only this thread can stop cProfile at the deadline
+        profile_timer = QTimer()
+        profile_timer.timeout.connect(profiler.poll)
+        profile_timer.start(500)
+    if args.watchdog is not None:
+        watchdog = StallWatchdog(args.watchdog)
+        watchdog.start()
+    selection = [int(i) for i in args.select.split(",") if i.strip()]
+    count = max([args.days] + selection) + 1
+    resolve_mp3 = get_mp3_from_page
+    if args.mirror:
+        from odb.mirror import mirror_records
+
+        items = mirror_records(args.mirror, count)
+        resolve_mp3 = {item["link"]: item["mp3_url"] for item in items}.get
+    else:
+        items = fetch_items(count)
+    devotional = items[0]
+    queue = None
+    if args.days or selection:
+        queue = queue_for(items, resolve_mp3, selection)
+    viewer = ODBViewer(devotional, queue)
+    if not args.no_live and queue is None:
+        from odb.qt.livefeed import LiveFeed
+
+        live_feed = LiveFeed(viewer.devotional, args.mirror)
+        live_feed.updated.connect(viewer.update_devotional)
+        live_feed.start()
+    if args.resident:
+        resident = ResidentServer(app, viewer)
     viewer.show()
+    trace.instant("window shown")
     sys.exit(app.exec_())
@@ -1,8 +1,5 @@
 import sys
-import requests
-from bs4 import BeautifulSoup
 from io import BytesIO
-from PIL import Image
 import re
 
 from PyQt5.QtWidgets import (
@@ -11,7 +8,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt, QUrl
-from PyQt5.QtMultimedia import QMediaPlayer, QMediaContent
+
+from odb import fetch
 
 FEED_URL = "https://ourdailybreadministries.ca/feed/"
 
@@ -19,7 +17,9 @@ FEED_URL = "https://ourdailybreadministries.ca/feed/"
 # Fetch first item from RSS
 # ----------------------------
 def fetch_first_item():
-    response = requests.get(FEED_URL, headers={"User-Agent": "Mozilla/5.0"})
+    from bs4 import BeautifulSoup
+
+    response = fetch.get(FEED_URL, kind="feed")
     response.raise_for_status()
     soup = BeautifulSoup(response.text, "xml")
 
@@ -50,10 +50,12 @@ def fetch_first_item():
 # Get MP3 from devotional page
 # ----------------------------
 def get_mp3_from_page(url):
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    response = fetch.get(url, kind="page")
     if response.status_code != 200:
         raise Exception(f"Failed to load devotional page: {response.status_code}")
 
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(response.text, "html.parser")
     # Check for <audio> tag
     audio_tag = soup.find("audio")
@@ -94,7 +96,9 @@ class ODBViewer(QWidget):
 
         # Image
         if data["image"]:
-            img_data = requests.get(data["image"]).content
+            from PIL import Image  # only needed when there is an image
+
+            img_data = fetch.get(data["image"], kind="image").content
             pil_img = Image.open(BytesIO(img_data))
             pil_img = pil_img.resize((750, 420))
             img_buffer = BytesIO()
@@ -115,34 +119,38 @@ class ODBViewer(QWidget):
         scroll.setWidget(text_browser)
         layout.addWidget(scroll)
 
-        # Audio Player
-        self.player = QMediaPlayer()
+        # Audio Player (QtMultimedia is only loaded when there is audio)
+        self.mp3_url = get_mp3_from_page(data["link"])
+        print("[INFO] MP3 URL:", self.mp3_url)
+
+        if self.mp3_url:
+            from PyQt5.QtMultimedia import QMediaPlayer
 
-        # Buttons: Play / Pause / Stop
-        button_layout = QHBoxLayout()
-        play_btn = QPushButton("Play")
-        pause_btn = QPushButton("Pause")
-        stop_btn = QPushButton("Stop")
+            self.player = QMediaPlayer()
 
-        play_btn.clicked.connect(self.play_audio)
-        pause_btn.clicked.connect(self.player.pause)
-        stop_btn.clicked.connect(self.player.stop)
+            # Buttons: Play / Pause / Stop
+            button_layout = QHBoxLayout()
+            play_btn = QPushButton("Play")
+            pause_btn = QPushButton("Pause")
+            stop_btn = QPushButton("Stop")
 
-        button_layout.addWidget(play_btn)
-        button_layout.addWidget(pause_btn)
-        button_layout.addWidget(stop_btn)
-        layout.addLayout(button_layout)
+            play_btn.clicked.connect(self.play_audio)
+            pause_btn.clicked.connect(self.player.pause)
+            stop_btn.clicked.connect(self.player.stop)
 
-        self.mp3_url = get_mp3_from_page(data["link"])
-        print("[INFO] MP3 URL:", self.mp3_url)
+            button_layout.addWidget(play_btn)
+            button_layout.addWidget(pause_btn)
+            button_layout.addWidget(stop_btn)
+            layout.addLayout(button_layout)
 
-        # Auto-play on startup
-        if self.mp3_url:
+            # Auto-play on startup
             self.play_audio()
 
         self.setLayout(layout)
 
     def play_audio(self):
+        from PyQt5.QtMultimedia import QMediaContent
+
         if self.mp3_url:
             self.player.setMedia(QMediaContent(QUrl(self.mp3_url)))
             self.player.play()
@@ -1,10 +1,18 @@
-import requests
-from bs4 import BeautifulSoup
-import pygame
-from io import BytesIO
-from PIL import Image
-import datetime
+from odb import profiling
+
+# Started this early so the imports below are part of a --profile run
+profiler = profiling.start_from_argv() if __name__ == "__main__" else None
+
+import argparse
+import os
 import re
+import time
+
+from odb import fetch
+from odb.audio_proxy import get_proxy
+from odb.cache import cache_path
+from odb.playqueue import queue_for
+from odb.scheduler import AUDIO
 
 FEED_URL = "https://ourdailybreadministries.ca/feed/"
 
@@ -12,21 +20,31 @@ FEED_URL = "https://ourdailybreadministries.ca/feed/"
 # 1. Fetch the RSS feed
 # ----------------------------
 def fetch_first_item():
+    return fetch_items(1)[0]
+
+
+def fetch_items(count):
+    """Fetch the newest ``count`` items (today first)"""
+    from bs4 import BeautifulSoup
+
     print("[INFO] Fetching RSS feed...")
-    response = requests.get(FEED_URL, headers={"User-Agent": "Mozilla/5.0"})
+    response = fetch.get(FEED_URL, kind="feed")
     response.raise_for_status()
     soup = BeautifulSoup(response.text, "xml")
 
-    first_item = soup.find("item")
-    if not first_item:
+    items = soup.find_all("item", limit=count)
+    if not items:
         raise Exception("No items found in feed.")
+    return [parse_item(item) for item in items]
+
 
-    title = first_item.find("title").text.strip()
-    link = first_item.find("link").text.strip()
-    pubDate = first_item.find("pubDate").text.strip()
-    creator_tag = first_item.find("dc:creator")
+def parse_item(item):
+    title = item.find("title").text.strip()
+    link = item.find("link").text.strip()
+    pubDate = item.find("pubDate").text.strip()
+    creator_tag = item.find("dc:creator")
     creator = creator_tag.text.strip() if creator_tag else "Unknown"
-    description_tag = first_item.find("description")
+    description_tag = item.find("description")
     description = description_tag.text.strip() if description_tag else ""
 
     print(f"[INFO] Title: {title}")
@@ -48,10 +66,12 @@ def fetch_first_item():
 # ----------------------------
 def get_mp3_from_page(url):
     print(f"[INFO] Fetching devotional page: {url}")
-    response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
+    response = fetch.get(url, kind="page")
     if response.status_code != 200:
         raise Exception(f"Failed to load devotional page: {response.status_code}")
 
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(response.text, "html.parser")
 
     # 1. Check for <audio> tag
@@ -71,34 +91,107 @@ def get_mp3_from_page(url):
 # 3. Play MP3 using pygame
 # ----------------------------
 def play_mp3(mp3_url):
+    import pygame
+
     print(f"[INFO] MP3 URL found: {mp3_url}")
     print("[INFO] Downloading MP3...")
-
-    mp3_data = requests.get(mp3_url, headers={"User-Agent": "Mozilla/5.0"}).content
-    mp3_file = "today_devotional.mp3"
-
-    with open(mp3_file, "wb") as f:
-        f.write(mp3_data)
+    get_proxy().prefetch(mp3_url, AUDIO).result()
 
     print("[INFO] Playing devotional audio...")
     pygame.mixer.init()
-    pygame.mixer.music.load(mp3_file)
+    pygame.mixer.music.load(cache_path(mp3_url))
     pygame.mixer.music.play()
 
     # Wait until playback finishes
     while pygame.mixer.music.get_busy():
-        continue
+        time.sleep(0.1)
+
+
+# ----------------------------
+# 4. Play a multi-day queue back to back
+# ----------------------------
+def play_queue(queue):
+    """Play every queued devotional, gaplessly where the audio is cached.
+
+    The next track is prefetched while the current one plays and handed to
+    pygame's own music queue, so it starts without a gap.  ``get_pos``
+    starts again from about 0 when a queued track takes over, so a drop in
+    it marks the track change.
+    """
+    import pygame
+
+    proxy = get_proxy()
+    pygame.mixer.init()
+
+    entry = queue.current
+    playing = False
+    last_pos = 0
+    pending, queued = None, False
+    while entry:
+        if not playing:
+            # First track, or the prefetch fell behind the previous one
+            print(f"[INFO] Playing: {entry['title']}")
+            proxy.prefetch(entry["mp3_url"], AUDIO).result()
+            if not os.path.exists(cache_path(entry["mp3_url"])):
+                print(f"[ERROR] Could not download audio for {entry['title']}")
+                entry = queue.advance()
+                continue
+            pygame.mixer.music.load(cache_path(entry["mp3_url"]))
+            pygame.mixer.music.play()
+            last_pos = 0
+            playing = True
+            pending = None
+
+        upcoming = queue.next_entry
+        if upcoming and pending is None:
+            pending = queue.prefetch_next()
+        if upcoming and not queued and pending.done() \
+                and os.path.exists(cache_path(upcoming["mp3_url"])):
+            pygame.mixer.music.queue(cache_path(upcoming["mp3_url"]))
+            queued = True
+
+        busy = pygame.mixer.music.get_busy()
+        pos = pygame.mixer.music.get_pos()
+        switched = pos < last_pos
+        last_pos = pos
+        if queued and (switched or not busy):
+            entry = queue.advance()
+            print(f"[INFO] Playing: {entry['title']}")
+            pending, queued = None, False
+        elif not busy:
+            entry = queue.advance()
+            playing = False
+            continue
+        time.sleep(0.1)
 
 # ----------------------------
 # MAIN EXECUTION
 # ----------------------------
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Our Daily Bread audio")
+    parser.add_argument("--days", type=int, default=0,
+                        help="also queue this many previous days")
+    parser.add_argument("--select", default="",
+                        help="comma separated feed positions to queue (0 = today)")
+    profiling.add_argument(parser)
+    args = parser.parse_args()
+
     try:
-        item = fetch_first_item()
-        mp3_url = get_mp3_from_page(item["link"])
-        if not mp3_url:
-            print("[ERROR] Could not find MP3 for this devotional.")
+        selection = [int(i) for i in args.select.split(",") if i.strip()]
+        if args.days or selection:
+            count = max([args.days] + selection) + 1
+            items = fetch_items(count)
+            queue = queue_for(items, get_mp3_from_page, selection)
+            if not queue.entries:
+                print("[ERROR] Could not find MP3 for any queued devotional.")
+            else:
+                play_queue(queue)
         else:
-            play_mp3(mp3_url)
+            item = fetch_first_item()
+            mp3_url = get_mp3_from_page(item["link"])
+            if not mp3_url:
+                print("[ERROR] Could not find MP3 for this devotional.")
+            else:
+                play_mp3(mp3_url)
     except Exception as e:
         print("[ERROR]", e)